@@ -0,0 +1,157 @@
+import asyncio
+import argparse
+import os
+from typing import List, Dict, Any
+from playwright.async_api import async_playwright
+from utils.browser import BrowserManager
+from utils.journal import RunJournal
+from utils.product_index import ProductIndex, DEFAULT_INDEX_PATH
+from utils.profiler import RunProfiler, DEFAULT_PROFILE_DIR
+from utils.scheduler import BATCH
+from sites.amazon import AmazonScraper
+from sites.ebay import EbayScraper
+from colorama import init
+from utils.print_utils import (
+    print_error, print_success, print_info, print_scheduler_metrics,
+    print_warmup_report, print_keepalive_report
+)
+
+# Initialize colorama
+init(autoreset=True)
+
+SCRAPERS = {
+    "Amazon": AmazonScraper,
+    "eBay": EbayScraper,
+}
+
+
+async def run_site(browser_manager, journal: RunJournal, scraper_class, query: str,
+                   num_products: int, details: bool, index: ProductIndex = None):
+    site = scraper_class(None).site_name
+    query_key = f"query:{site}:{query}"
+    if journal.is_done(query_key):
+        return
+
+    if query_key in journal.searches:
+        products = journal.searches[query_key]
+    else:
+        journal.start(query_key)
+        page = await browser_manager.new_page(scraper_class.profile_for('search_products'))
+        try:
+            async with browser_manager.scheduler.slot(BATCH):
+                products = await scraper_class(page, index).search_products(query, num_products)
+        finally:
+            await page.close()
+        if not products:
+            # Left in flight so the next run tries the query again
+            print_error(f"No {site} results for '{query}', will retry on the next run")
+            return
+        journal.record_search(query_key, products)
+
+    if not details:
+        journal.complete(query_key, [{'query': query, 'site': site, 'product': p} for p in products])
+        print_success(f"{site} '{query}': {len(products)} products")
+        return
+
+    page = await browser_manager.new_page(scraper_class.profile_for('get_product_details'))
+    failed = 0
+    try:
+        scraper = scraper_class(page, index)
+        for product in products:
+            product_key = f"product:{site}:{product['url']}"
+            if journal.is_done(product_key):
+                continue
+            journal.start(product_key)
+            async with browser_manager.scheduler.slot(BATCH):
+                product_details = await scraper.get_product_details(product['url'])
+            if not scraper.has_details(product_details):
+                # Scrapers return empty details on errors such as a block; left in flight to retry
+                print_error(f"No {site} details for {product['url']}, will retry on the next run")
+                failed += 1
+                continue
+            journal.complete(product_key, [
+                {'query': query, 'site': site, 'product': product, 'details': product_details}
+            ])
+    finally:
+        await page.close()
+    if failed:
+        # The query stays in flight too, or the next run would skip its unfinished products
+        print_error(f"{site} '{query}': {failed} of {len(products)} products without details")
+        return
+    journal.complete(query_key)
+    print_success(f"{site} '{query}': {len(products)} products with details")
+
+
+async def run_batch(queries: List[str], sites: List[str], num_products: int, output: str,
+                    journal_path: str, details: bool, profile_dir: str = None,
+                    index_path: str = DEFAULT_INDEX_PATH):
+    journal = RunJournal(journal_path, output)
+    # Results also feed the local index that interactive local-first search answers from
+    index = ProductIndex(index_path) if index_path else None
+    if journal.done or journal.in_flight:
+        print_info(f"Resuming: {len(journal.done)} items done, {len(journal.in_flight)} in flight will be re-run")
+    profiler = None
+    try:
+        if profile_dir:
+            profiler = RunProfiler(profile_dir)
+            profiler.start()
+        async with async_playwright() as playwright:
+            browser_manager = BrowserManager()
+            await browser_manager.init_browser(playwright)
+            for scraper_class in SCRAPERS.values():
+                browser_manager.register_site(scraper_class(None).base_url)
+            print_warmup_report(await browser_manager.warm_up())
+            if profiler:
+                await profiler.attach(browser_manager)
+            try:
+                for query in queries:
+                    results = await asyncio.gather(*(
+                        run_site(browser_manager, journal, SCRAPERS[site], query, num_products, details, index)
+                        for site in sites
+                    ), return_exceptions=True)
+                    for site, result in zip(sites, results):
+                        if isinstance(result, Exception):
+                            print_error(f"Error scraping {site} for '{query}': {result}")
+            finally:
+                if profiler:
+                    print_info(f"Profiling report written to {await profiler.stop(browser_manager)}")
+                print_scheduler_metrics(browser_manager.scheduler.metrics())
+                print_keepalive_report(browser_manager.warmer.report())
+                await browser_manager.close()
+    finally:
+        journal.close()
+        if index:
+            index.close()
+
+
+def read_queries(path: str) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumable batch scraping of a list of queries")
+    parser.add_argument("queries_file", help="text file with one search query per line")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSON Lines output file")
+    parser.add_argument("--journal", help="journal file (default: <output>.journal)")
+    parser.add_argument("--sites", nargs="+", default=list(SCRAPERS), choices=list(SCRAPERS))
+    parser.add_argument("--num-products", type=int, default=3)
+    parser.add_argument("--details", action="store_true", help="also scrape each product's details")
+    parser.add_argument("--fresh", action="store_true", help="discard the journal and output and start over")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_DIR, metavar="DIR")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="local product index to add results to")
+    parser.add_argument("--no-index", action="store_true", help="don't add results to the local index")
+    args = parser.parse_args()
+
+    journal_path = args.journal or f"{args.output}.journal"
+    if args.fresh:
+        for path in (journal_path, args.output):
+            if os.path.exists(path):
+                os.remove(path)
+
+    try:
+        asyncio.run(run_batch(read_queries(args.queries_file), args.sites, args.num_products,
+                              args.output, journal_path, args.details, args.profile,
+                              None if args.no_index else args.index))
+    except KeyboardInterrupt:
+        print_info("Stopped; run the same command again to resume")
@@ -0,0 +1,82 @@
+"""Compare latency and browser CPU of each context profile per page type.
+
+Usage: python -m benchmarks.page_profiles [query] [runs]
+"""
+import sys
+import time
+import asyncio
+from statistics import median
+from typing import Dict, Any, List
+from playwright.async_api import async_playwright
+from utils.browser import BrowserManager, CONTEXT_PROFILES
+from sites.amazon import AmazonScraper
+from sites.ebay import EbayScraper
+
+
+async def _task_duration(cdp) -> float:
+    """Renderer main-thread busy time in seconds, from the Performance domain"""
+    metrics = await cdp.send('Performance.getMetrics')
+    return next((m['value'] for m in metrics['metrics'] if m['name'] == 'TaskDuration'), 0.0)
+
+
+async def measure(browser_manager, profile: str, scraper_class, method_name: str, arg, runs: int) -> Dict[str, Any]:
+    latencies, cpu_times, items = [], [], 0
+    for _ in range(runs):
+        page = await browser_manager.new_page(profile)
+        try:
+            cdp = await page.context.new_cdp_session(page)
+            await cdp.send('Performance.enable')
+            cpu_before = await _task_duration(cdp)
+            start = time.perf_counter()
+            result = await getattr(scraper_class(page), method_name)(*arg)
+            latencies.append(time.perf_counter() - start)
+            cpu_times.append(await _task_duration(cdp) - cpu_before)
+            if isinstance(result, list):
+                items = len(result)
+            else:
+                items = len(result.get('specifications', {})) + len(result.get('special_features', []))
+        finally:
+            await page.close()
+    return {
+        'latency': median(latencies),
+        'cpu': median(cpu_times),
+        'items': items,
+    }
+
+
+async def run(query: str, runs: int):
+    async with async_playwright() as playwright:
+        browser_manager = BrowserManager()
+        await browser_manager.init_browser(playwright)
+        try:
+            rows: List[tuple] = []
+            for scraper_class in (AmazonScraper, EbayScraper):
+                # Detail URLs come from a search in the default profile
+                page = await browser_manager.new_page()
+                products = await scraper_class(page).search_products(query, 1)
+                await page.close()
+
+                page_types = [('search', 'search_products', (query, 3))]
+                if products:
+                    page_types.append(('details', 'get_product_details', (products[0]['url'],)))
+
+                site = scraper_class(None).site_name
+                for page_type, method_name, arg in page_types:
+                    declared = scraper_class.profile_for(method_name)
+                    for profile in CONTEXT_PROFILES:
+                        stats = await measure(browser_manager, profile, scraper_class, method_name, arg, runs)
+                        rows.append((site, page_type, profile, profile == declared, stats))
+        finally:
+            await browser_manager.close()
+
+    print(f"\n{'site':<8}{'page':<9}{'profile':<10}{'latency (s)':>13}{'cpu (s)':>10}{'items':>7}")
+    for site, page_type, profile, declared, stats in rows:
+        marker = ' *' if declared else ''
+        print(f"{site:<8}{page_type:<9}{profile:<10}{stats['latency']:>13.3f}{stats['cpu']:>10.3f}{stats['items']:>7}{marker}")
+    print("\n* profile declared by the scraper method; cpu is renderer main-thread time (TaskDuration)")
+
+
+if __name__ == "__main__":
+    query = sys.argv[1] if len(sys.argv) > 1 else "laptop"
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    asyncio.run(run(query, runs))
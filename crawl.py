@@ -0,0 +1,191 @@
+import asyncio
+import argparse
+import json
+from typing import List, Dict, Any, Optional
+from playwright.async_api import async_playwright
+from utils.browser import BrowserManager
+from utils.bloom import ScalableBloomFilter
+from utils.product_index import ProductIndex, DEFAULT_INDEX_PATH
+from utils.profiler import RunProfiler, DEFAULT_PROFILE_DIR
+from utils.scheduler import BATCH
+from sites.amazon import AmazonScraper
+from sites.ebay import EbayScraper
+from colorama import init
+from utils.print_utils import (
+    print_error, print_success, print_info, print_scheduler_metrics,
+    print_warmup_report, print_keepalive_report
+)
+
+# Initialize colorama
+init(autoreset=True)
+
+SCRAPERS = {
+    "Amazon": AmazonScraper,
+    "eBay": EbayScraper,
+}
+
+DEFAULT_SEEN_PATH = "crawl_seen.bloom"
+SAVE_EVERY_PAGES = 10
+
+
+class Crawler:
+    """Walks result pages for many query variations, passing on only unseen products"""
+
+    def __init__(self, browser_manager, seen: ScalableBloomFilter, seen_path: str, output,
+                 details: bool = False, max_pages: int = 20, stale_pages: int = 5,
+                 index: ProductIndex = None):
+        self.browser_manager = browser_manager
+        self.seen = seen
+        self.seen_path = seen_path
+        self.output = output
+        self.details = details
+        self.max_pages = max_pages
+        self.stale_pages = stale_pages
+        self.index = index
+        self.pages_since_save = 0
+        self.new_items = 0
+        self.skipped_items = 0
+        self.failed_items = 0
+
+    def checkpoint(self, force: bool = False):
+        self.pages_since_save += 1
+        if force or self.pages_since_save >= SAVE_EVERY_PAGES:
+            self.output.flush()
+            self.seen.save(self.seen_path)
+            self.pages_since_save = 0
+
+    async def crawl_site(self, scraper_class, queries: List[str], category: Optional[str]):
+        search_page = await self.browser_manager.new_page(scraper_class.profile_for('search_page'))
+        details_page = None
+        if self.details:
+            details_page = await self.browser_manager.new_page(scraper_class.profile_for('get_product_details'))
+        try:
+            searcher = scraper_class(search_page, self.index)
+            detailer = scraper_class(details_page, self.index) if details_page else None
+            for query in queries:
+                if not query and not category:
+                    print_error(f"{searcher.site_name}: no category given, skipping the empty query")
+                    continue
+                for sort in scraper_class.SORT_ORDERS:
+                    await self._crawl_variation(searcher, detailer, query, category, sort)
+        finally:
+            for page in (search_page, details_page):
+                if page:
+                    await page.close()
+
+    async def _crawl_variation(self, searcher, detailer, query: str, category: Optional[str], sort: Optional[str]):
+        label = f"{searcher.site_name} '{query}'" + (f" category {category}" if category else "") + (f" sort {sort}" if sort else "")
+        stale = 0
+        for page_number in range(1, self.max_pages + 1):
+            try:
+                async with self.browser_manager.scheduler.slot(BATCH):
+                    products = await searcher.search_page(query, page_number, category, sort)
+            except Exception as e:
+                print_error(f"{label}: stopping at page {page_number}: {e}")
+                break
+            if not products:
+                break
+
+            new = 0
+            for product in products:
+                key = searcher.item_id(product['url'])
+                if key in self.seen:
+                    self.skipped_items += 1
+                    continue
+                record = {'site': searcher.site_name, 'id': key, 'query': query,
+                          'category': category, 'product': product}
+                if detailer:
+                    try:
+                        async with self.browser_manager.scheduler.slot(BATCH):
+                            record['details'] = await detailer.get_product_details(product['url'])
+                        if not detailer.has_details(record['details']):
+                            # Scrapers return empty details instead of raising when extraction fails
+                            raise RuntimeError("no details extracted")
+                    except Exception as e:
+                        # Left unseen so the next run scrapes it again
+                        print_error(f"{label}: skipping {key}, details failed: {e}")
+                        self.failed_items += 1
+                        continue
+                self.output.write(json.dumps(record) + '\n')
+                # Marked seen only once written, so an interrupted item is picked up next run
+                self.seen.add(key)
+                new += 1
+            self.new_items += new
+            self.checkpoint()
+            print_info(f"{label}: page {page_number}, {new} new of {len(products)}")
+
+            stale = stale + 1 if new == 0 else 0
+            if self.stale_pages and stale >= self.stale_pages:
+                break
+
+
+async def run_crawl(queries: List[str], sites: List[str], categories: Dict[str, Optional[str]],
+                    output_path: str, seen_path: str, details: bool, max_pages: int, stale_pages: int,
+                    profile_dir: str = None, index_path: str = DEFAULT_INDEX_PATH):
+    seen = ScalableBloomFilter.open(seen_path)
+    # Crawled products also feed the local index that interactive local-first search answers from
+    index = ProductIndex(index_path) if index_path else None
+    print_info(f"Loaded {len(seen)} seen products from {seen_path}")
+    profiler = None
+    if profile_dir:
+        profiler = RunProfiler(profile_dir)
+        profiler.start()
+    with open(output_path, 'a', encoding='utf-8') as output:
+        async with async_playwright() as playwright:
+            browser_manager = BrowserManager()
+            await browser_manager.init_browser(playwright)
+            for scraper_class in SCRAPERS.values():
+                browser_manager.register_site(scraper_class(None).base_url)
+            print_warmup_report(await browser_manager.warm_up())
+            if profiler:
+                await profiler.attach(browser_manager)
+            crawler = Crawler(browser_manager, seen, seen_path, output, details, max_pages, stale_pages, index)
+            try:
+                results = await asyncio.gather(*(
+                    crawler.crawl_site(SCRAPERS[site], queries, categories.get(site))
+                    for site in sites
+                ), return_exceptions=True)
+                for site, result in zip(sites, results):
+                    if isinstance(result, Exception):
+                        print_error(f"Error crawling {site}: {result}")
+            finally:
+                crawler.checkpoint(force=True)
+                print_success(f"{crawler.new_items} new products, {crawler.skipped_items} already seen, "
+                              f"{crawler.failed_items} failed ({len(seen)} in {seen_path})")
+                if profiler:
+                    print_info(f"Profiling report written to {await profiler.stop(browser_manager)}")
+                print_scheduler_metrics(browser_manager.scheduler.metrics())
+                print_keepalive_report(browser_manager.warmer.report())
+                await browser_manager.close()
+                if index:
+                    index.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl search and category result pages for new products")
+    parser.add_argument("queries", nargs="*", help="search queries (may be empty when a category is given)")
+    parser.add_argument("--sites", nargs="+", default=list(SCRAPERS), choices=list(SCRAPERS))
+    parser.add_argument("--amazon-category", help="Amazon browse node id, e.g. 565108 for laptops")
+    parser.add_argument("--ebay-category", help="eBay category id, e.g. 177 for PC laptops")
+    parser.add_argument("--max-pages", type=int, default=20, help="result pages per query and sort order")
+    parser.add_argument("--stale-pages", type=int, default=5,
+                        help="stop a variation after this many pages with nothing new (0 = never)")
+    parser.add_argument("--details", action="store_true", help="scrape details of every new product")
+    parser.add_argument("-o", "--output", default="crawl.jsonl", help="JSON Lines output file (appended)")
+    parser.add_argument("--seen", default=DEFAULT_SEEN_PATH, help="Bloom filter of products already crawled")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_DIR, metavar="DIR")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="local product index to add products to")
+    parser.add_argument("--no-index", action="store_true", help="don't add products to the local index")
+    args = parser.parse_args()
+
+    categories = {"Amazon": args.amazon_category, "eBay": args.ebay_category}
+    queries = args.queries or [""]
+    if queries == [""] and not any(categories[site] for site in args.sites):
+        parser.error("give at least one query or a category")
+
+    try:
+        asyncio.run(run_crawl(queries, args.sites, categories, args.output, args.seen,
+                              args.details, args.max_pages, args.stale_pages, args.profile,
+                              None if args.no_index else args.index))
+    except KeyboardInterrupt:
+        print_info("Stopped; seen products are saved, run again to continue")
@@ -1,18 +1,27 @@
 import asyncio
+import argparse
 from playwright.async_api import async_playwright
 from utils.browser import BrowserManager
 from sites.amazon import AmazonScraper
 from sites.ebay import EbayScraper
 from sites.concurrent_search import search_all_sites
 from typing import List, Dict, Any
-from sites.base_scraper import BaseScraper
+from sites.base_scraper import BaseScraper, LOCAL_MAX_AGE
+from utils.matching import match_products
+from utils.product_index import ProductIndex
+from utils.async_input import ainput
+from utils.profiler import RunProfiler, DEFAULT_PROFILE_DIR
+from utils.scheduler import INTERACTIVE, PREFETCH
 from colorama import init
 from utils.print_utils import (
     print_header, print_available_sites, print_search_results,
     print_product_details, print_error, print_success, print_info,
-    print_separator
+    print_separator, print_matched_groups, print_warmup_report, print_keepalive_report
 )
 
+# Number of listed products per site whose details are fetched while the user chooses
+PREFETCH_LIMIT = 5
+
 # Initialize colorama
 init(autoreset=True)
 
@@ -20,38 +29,124 @@ AVAILABLE_SITES = {
     "1": ("Amazon", AmazonScraper),
     "2": ("eBay", EbayScraper),
     "3": ("All Sites", None),
-    "4": ("Change Number of Products", None)
+    "4": ("Change Number of Products", None),
+    "5": ("Toggle Local-First Search", None)
 }
 
 async def initialize_browser():
     browser_manager = BrowserManager()
     playwright = await async_playwright().start()
     await browser_manager.init_browser(playwright)
-    page = await browser_manager.new_page()
-    return browser_manager, playwright, page
+    for scraper_class in (AmazonScraper, EbayScraper):
+        browser_manager.register_site(scraper_class(None).base_url)
+    return browser_manager, playwright
+
+async def page_for(browser_manager, pages: Dict[str, Any], scraper_class, method_name: str):
+    """Return a reusable page in the context profile the scraper method declares"""
+    profile = scraper_class.profile_for(method_name)
+    if profile not in pages:
+        pages[profile] = await browser_manager.new_page(profile)
+    return pages[profile]
+
+def indexed_details(index, products: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Fresh details already in the local index, so matching can compare specs as well as titles"""
+    if not index:
+        return {}
+    details = {}
+    for product in products:
+        product_details = index.get_details(product['url'], max_age=LOCAL_MAX_AGE)
+        if BaseScraper.has_details(product_details):
+            details[product['url']] = product_details
+    return details
+
+async def prefetch_details(browser_manager, products: List[Dict[str, Any]], index,
+                           prefetched: Dict[str, Dict[str, Any]], local_first: bool = False, group: str = None,
+                           in_flight: Dict[str, asyncio.Task] = None):
+    """Fetch details of listed products in the background, one page per site.
+
+    Each product is fetched in its own task, recorded in in_flight by URL, so
+    preempting or cancelling one fetch leaves the rest of the site's list going.
+    """
+    in_flight = {} if in_flight is None else in_flight
+
+    async def prefetch_product(scraper, url):
+        try:
+            async with browser_manager.scheduler.slot(PREFETCH, group):
+                if local_first:
+                    details = await scraper.local_first_details(url)
+                else:
+                    details = await scraper.get_product_details(url)
+        except Exception as e:
+            print_error(f"Error prefetching details: {e}")
+            return
+        # Failed extractions are left out so choosing the product tries the site again
+        if BaseScraper.has_details(details):
+            prefetched[url] = details
+
+    async def prefetch_site(scraper_class, site_products):
+        page = await browser_manager.new_page(scraper_class.profile_for('get_product_details'))
+        task = None
+        try:
+            scraper = scraper_class(page, index)
+            for product in site_products[:PREFETCH_LIMIT]:
+                task = asyncio.create_task(prefetch_product(scraper, product['url']))
+                in_flight[product['url']] = task
+                # wait() leaves the fetch running if this loop is cancelled, in case it is the one chosen
+                await asyncio.wait({task})
+        finally:
+            if task and not task.done():
+                # The page is closed only once its last fetch has finished or been cancelled
+                await asyncio.wait({task})
+            try:
+                await page.close()
+            except:
+                pass
 
-async def display_product_details(scraper: BaseScraper, products: List[Dict[str, Any]], choice: int):
+    await asyncio.gather(*(
+        prefetch_site(scraper_class, [p for p in products if p.get('site') == site_name])
+        for site_name, scraper_class in (("Amazon", AmazonScraper), ("eBay", EbayScraper))
+        if any(p.get('site') == site_name for p in products)
+    ), return_exceptions=True)
+
+async def display_product_details(browser_manager, scraper: BaseScraper, products: List[Dict[str, Any]],
+                                  choice: int, local_first: bool = False,
+                                  prefetched: Dict[str, Dict[str, Any]] = None,
+                                  pending: asyncio.Task = None):
     try:
         product = products[choice]
-        details = await scraper.get_product_details(product['url'])
+        if pending:
+            # The product's prefetch was already under way; let it finish rather than start over
+            await asyncio.wait({pending})
+        if prefetched and product['url'] in prefetched:
+            details = prefetched[product['url']]
+        else:
+            async with browser_manager.scheduler.slot(INTERACTIVE):
+                if local_first:
+                    details = await scraper.local_first_details(product['url'])
+                else:
+                    details = await scraper.get_product_details(product['url'])
         print_product_details(product, details)
     except Exception as e:
         print_error(f"Error displaying product details: {e}")
 
-async def main(browser_manager, page):
+async def main(browser_manager, index=None):
+    local_first = False
+    pages = {}
+    search_count = 0
     while True:
+        prefetch_task = None
         try:
             print_header()
             num_products = 3  # Default value
             
             while True:
-                print_available_sites(AVAILABLE_SITES, num_products)
-                choice = input("\nChoose an option: ")
+                print_available_sites(AVAILABLE_SITES, num_products, local_first)
+                choice = await ainput("\nChoose an option: ")
                 
                 if choice == "4":
                     while True:
                         try:
-                            num_input = input("Enter number of products to scrape (1-21): ")
+                            num_input = await ainput("Enter number of products to scrape (1-21): ")
                             new_num = int(num_input)
                             if 1 <= new_num <= 21:
                                 num_products = new_num
@@ -60,21 +155,29 @@ async def main(browser_manager, page):
                             print_error("Please enter a number between 1 and 21.")
                         except ValueError:
                             print_error("Please enter a valid number.")
+                elif choice == "5":
+                    local_first = not local_first
+                    print_success(f"Local-first search {'enabled' if local_first else 'disabled'}\n")
                 elif choice in ["1", "2", "3"] or choice.lower() == 'all':
                     break
                 else:
                     print_error("Invalid choice. Please try again.\n")
 
-            query = input("Enter a product name to search: ")
+            query = await ainput("Enter a product name to search: ")
 
             if choice.lower() == 'all' or choice == '3':
                 print_success("Initializing browsers for concurrent search")
-                results = await search_all_sites(browser_manager, query, num_products)
+                results = await search_all_sites(browser_manager, query, num_products, index, local_first)
             else:
                 site_name, scraper_class = AVAILABLE_SITES[choice]
                 print_success(f"Initializing browser for {site_name}")
-                scraper = scraper_class(page)
-                results = await scraper.search_products(query, num_products)
+                page = await page_for(browser_manager, pages, scraper_class, 'search_products')
+                scraper = scraper_class(page, index)
+                async with browser_manager.scheduler.slot(INTERACTIVE):
+                    if local_first:
+                        results = await scraper.local_first_search(query, num_products)
+                    else:
+                        results = await scraper.search_products(query, num_products)
                 for product in results:
                     product['site'] = site_name
 
@@ -83,10 +186,21 @@ async def main(browser_manager, page):
                 continue
             
             print_search_results(results)
+            if choice.lower() == 'all' or choice == '3':
+                print_matched_groups(match_products(results, indexed_details(index, results)))
+
+            # Details keep loading while the user reads the list and picks a product
+            prefetched = {}
+            in_flight = {}
+            search_count += 1
+            search_group = f"search-{search_count}"
+            prefetch_task = asyncio.create_task(
+                prefetch_details(browser_manager, results, index, prefetched, local_first, search_group, in_flight)
+            )
             
             while True:
                 try:
-                    choice = int(input(f"Enter the product number (1-{len(results)}) to see more details: "))
+                    choice = int(await ainput(f"Enter the product number (1-{len(results)}) to see more details: "))
                     if 1 <= choice <= len(results):
                         break
                     print_error(f"Invalid product number. Please enter a number between 1 and {len(results)}.")
@@ -94,19 +208,30 @@ async def main(browser_manager, page):
                     print_error("Please enter a valid number.")
 
             product = results[choice - 1]
+            pending = None
+            if product['url'] not in prefetched:
+                # Only the chosen product's own prefetch is still useful; stop the rest and free their slots
+                pending = in_flight.get(product['url'])
+                prefetch_task.cancel()
+                for task in in_flight.values():
+                    if task is not pending:
+                        task.cancel()
             site = product.get('site')
             if site == 'Amazon':
-                scraper = AmazonScraper(page)
+                scraper_class = AmazonScraper
             elif site == 'eBay':
-                scraper = EbayScraper(page)
+                scraper_class = EbayScraper
             else:
                 print_error("No specific scraper available for displaying detailed product information.")
                 continue
+            page = await page_for(browser_manager, pages, scraper_class, 'get_product_details')
+            scraper = scraper_class(page, index)
 
-            await display_product_details(scraper, results, choice - 1)
+            await display_product_details(browser_manager, scraper, results, choice - 1, local_first,
+                                          prefetched, pending)
 
             while True:
-                continue_choice = input("\nWould you like to perform another search? (y/N): ").lower()
+                continue_choice = (await ainput("\nWould you like to perform another search? (y/N): ")).lower()
                 if continue_choice in ['y', 'n', '']:
                     break
                 print_error("Please enter 'y' for yes or 'n' for no.")
@@ -120,27 +245,65 @@ async def main(browser_manager, page):
         except Exception as e:
             print_error(f"An error occurred: {e}")
             break
+        finally:
+            if prefetch_task and not prefetch_task.done():
+                # Product fetches run in their own tasks; drop this search's remaining ones first
+                browser_manager.scheduler.cancel(PREFETCH, search_group)
+                prefetch_task.cancel()
+                await asyncio.gather(prefetch_task, return_exceptions=True)
 
-if __name__ == "__main__":
+async def run(profile_dir: str = None):
     browser_manager = None
     playwright = None
-    
+    index = None
+    profiler = None
+    warmup_task = None
+
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        browser_manager, playwright, page = loop.run_until_complete(initialize_browser())
-        loop.run_until_complete(main(browser_manager, page))
-        
+        if profile_dir:
+            profiler = RunProfiler(profile_dir)
+            profiler.start()
+        browser_manager, playwright = await initialize_browser()
+        if profiler:
+            await profiler.attach(browser_manager)
+        # Connections open in the background while the user picks a site and types a query
+        warmup_task = asyncio.create_task(browser_manager.warm_up())
+        index = ProductIndex()
+        await main(browser_manager, index)
+    except asyncio.CancelledError:
+        # Ctrl-C cancels this task; clean up below, then let asyncio.run re-raise
+        print_info("\nCancelled, shutting down...")
+        raise
     except Exception as e:
         print_error(f"Fatal error: {e}")
     finally:
         try:
+            if profiler:
+                report_path = await profiler.stop(browser_manager)
+                print_info(f"Profiling report written to {report_path}")
+            if warmup_task and warmup_task.done() and not warmup_task.cancelled() and not warmup_task.exception():
+                print_warmup_report(warmup_task.result())
+                print_keepalive_report(browser_manager.warmer.report())
+            elif warmup_task:
+                warmup_task.cancel()
+                await asyncio.gather(warmup_task, return_exceptions=True)
+            if index:
+                index.close()
             if browser_manager and playwright:
-                loop.run_until_complete(browser_manager.close())
-                loop.run_until_complete(playwright.stop())
-            if loop:
-                loop.run_until_complete(loop.shutdown_asyncgens())
-                loop.close()
+                await browser_manager.close()
+                await playwright.stop()
         except Exception as e:
-            print_error(f"Error during cleanup: {e}")
\ No newline at end of file
+            print_error(f"Error during cleanup: {e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Amazon and eBay product scraper")
+    parser.add_argument(
+        "--profile", nargs="?", const=DEFAULT_PROFILE_DIR, metavar="DIR",
+        help=f"profile the run with cProfile, tracemalloc and Playwright tracing (default dir: {DEFAULT_PROFILE_DIR})"
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args.profile))
+    except KeyboardInterrupt:
+        print_success("Thank you for using the scraper!")
\ No newline at end of file
@@ -1,72 +1,108 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from playwright.async_api import Page
 import asyncio
-from urllib.parse import quote
-from .base_scraper import BaseScraper
+from urllib.parse import quote, urlencode
+import re
+from .base_scraper import BaseScraper, page_profile, RESULTS_PER_PAGE
+from utils.product_index import ProductIndex
 
 class AmazonScraper(BaseScraper):
-    def __init__(self, page: Page):
-        super().__init__(page)
+    # Sort orders used as crawl variations; each surfaces a different slice of the catalog
+    SORT_ORDERS = [None, 'price-asc-rank', 'price-desc-rank', 'review-rank', 'date-desc-rank']
+
+    def __init__(self, page: Page, index: Optional[ProductIndex] = None):
+        super().__init__(page, index)
         self.base_url = "https://www.amazon.com"
 
     @property
     def site_name(self) -> str:
         return "Amazon"
 
+    @page_profile('static')
     async def search_products(self, query: str, num_products: int = 3) -> List[Dict[str, Any]]:
-        search_url = f"{self.base_url}/s?k={quote(query)}"
-        
         try:
-            await self.page.goto(search_url, wait_until='domcontentloaded', timeout=30000)
-            await self.page.wait_for_selector(".s-desktop-width-max, .s-error-card", timeout=30000)
-            
-            # Extract all products in one JavaScript execution
-            products = await self.page.evaluate(f"""
-                () => {{
-                    const products = [];
-                    const cards = document.querySelectorAll('div[data-asin]:not([data-asin=""]):nth-child(-n+{num_products + 10})');
-                    
-                    for (const card of cards) {{
-                        try {{
-                            if (card.querySelector('[data-component-type="sp-sponsored-result"]')) {{
-                                continue;
-                            }}
-                            
-                            const nameElem = card.querySelector('h2.a-size-medium.a-text-normal, h2.a-size-medium.a-text-normal > span') || 
-                                           card.querySelector('h2.a-size-base-plus, h2.a-size-base-plus > span');
-                            const ratingElem = card.querySelector('span.a-icon-alt');
-                            const ratingCountElem = card.querySelector('span.a-size-base');
-                            const priceElem = card.querySelector('span.a-price > span.a-offscreen');
-                            const urlElem = card.querySelector('a[href*="/dp/"]');
-                            
-                            if (nameElem && urlElem) {{
-                                products.push({{
-                                    Name: (nameElem.getAttribute('aria-label') || nameElem.textContent).trim(),
-                                    Rating: ratingElem ? ratingElem.textContent.trim() : 'N/A',
-                                    Rating_count: ratingCountElem ? ratingCountElem.textContent.trim() : 'N/A',
-                                    Price: priceElem ? priceElem.textContent.trim() : 'N/A',
-                                    url: urlElem.href
-                                }});
-                            }}
-                            
-                            if (products.length >= {num_products}) {{
-                                break;
-                            }}
-                        }} catch (e) {{
-                            continue;
-                        }}
-                    }}
-                    
-                    return products.slice(0, {num_products});
-                }}
-            """)
-            
+            products = await self._scrape_results(self.search_url(query), num_products)
+            self._index_products(products)
             return products
             
         except Exception as e:
             print(f"Error accessing Amazon: {e}")
             return []
 
+    @page_profile('static')
+    async def search_page(self, query: str, page_number: int = 1, category: Optional[str] = None,
+                          sort: Optional[str] = None) -> List[Dict[str, Any]]:
+        products = await self._scrape_results(
+            self.search_url(query, page_number, category, sort), RESULTS_PER_PAGE
+        )
+        self._index_products(products)
+        return products
+
+    def search_url(self, query: str, page_number: int = 1, category: Optional[str] = None,
+                   sort: Optional[str] = None) -> str:
+        """Build a search or category (browse node) results URL"""
+        params = {}
+        if query:
+            params['k'] = query
+        if category:
+            params['rh'] = f"n:{category}"
+        if sort:
+            params['s'] = sort
+        if page_number > 1:
+            params['page'] = page_number
+        return f"{self.base_url}/s?{urlencode(params, quote_via=quote)}"
+
+    def item_id(self, url: str) -> str:
+        match = re.search(r'/(?:dp|gp/product)/([A-Z0-9]{10})', url)
+        return f"asin:{match.group(1)}" if match else super().item_id(url)
+
+    async def _scrape_results(self, search_url: str, num_products: int) -> List[Dict[str, Any]]:
+        await self.page.goto(search_url, wait_until='domcontentloaded', timeout=30000)
+        await self.page.wait_for_selector(".s-desktop-width-max, .s-error-card", timeout=30000)
+        
+        # Extract all products in one JavaScript execution
+        products = await self.page.evaluate(f"""
+            () => {{
+                const products = [];
+                const cards = document.querySelectorAll('div[data-asin]:not([data-asin=""]):nth-child(-n+{num_products + 10})');
+                
+                for (const card of cards) {{
+                    try {{
+                        if (card.querySelector('[data-component-type="sp-sponsored-result"]')) {{
+                            continue;
+                        }}
+                        
+                        const nameElem = card.querySelector('h2.a-size-medium.a-text-normal, h2.a-size-medium.a-text-normal > span') || 
+                                       card.querySelector('h2.a-size-base-plus, h2.a-size-base-plus > span');
+                        const ratingElem = card.querySelector('span.a-icon-alt');
+                        const ratingCountElem = card.querySelector('span.a-size-base');
+                        const priceElem = card.querySelector('span.a-price > span.a-offscreen');
+                        const urlElem = card.querySelector('a[href*="/dp/"]');
+                        
+                        if (nameElem && urlElem) {{
+                            products.push({{
+                                Name: (nameElem.getAttribute('aria-label') || nameElem.textContent).trim(),
+                                Rating: ratingElem ? ratingElem.textContent.trim() : 'N/A',
+                                Rating_count: ratingCountElem ? ratingCountElem.textContent.trim() : 'N/A',
+                                Price: priceElem ? priceElem.textContent.trim() : 'N/A',
+                                url: urlElem.href
+                            }});
+                        }}
+                        
+                        if (products.length >= {num_products}) {{
+                            break;
+                        }}
+                    }} catch (e) {{
+                        continue;
+                    }}
+                }}
+                
+                return products.slice(0, {num_products});
+            }}
+        """)
+        return products
+
+    @page_profile('default')
     async def get_product_details(self, url: str) -> Dict[str, Any]:
         try:
             await self.page.goto(url, wait_until='domcontentloaded')
@@ -148,6 +184,7 @@ class AmazonScraper(BaseScraper):
                 key=lambda x: (not x.startswith('['), x)
             )
             
+            self._index_details(url, details)
             return details
             
         except Exception as e:
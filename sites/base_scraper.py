@@ -1,26 +1,99 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from playwright.async_api import Page
+from utils.product_index import ProductIndex
+
+# Local results older than this (seconds) are not used by local-first search
+LOCAL_MAX_AGE = 3600
+
+# Upper bound on products read from one crawled results page
+RESULTS_PER_PAGE = 100
+
+def page_profile(profile: str):
+    """Declare which BrowserManager context profile a scraper method's page needs"""
+    def decorator(method):
+        method.page_profile = profile
+        return method
+    return decorator
 
 class BaseScraper(ABC):
     """Base class for all e-commerce site scrapers"""
-    
-    def __init__(self, page: Page):
+
+    # Result orderings a crawl walks through to reach more of the catalog
+    SORT_ORDERS: List[Optional[str]] = [None]
+
+    def __init__(self, page: Page, index: Optional[ProductIndex] = None):
         self.page = page
+        self.index = index
         self.base_url = ""  # Each site will set its own base URL
-        
+
     @abstractmethod
     async def search_products(self, query: str, num_products: int = 3) -> List[Dict[str, Any]]:
         """Search for products and return specified number of valid results"""
         pass
-        
+
     @abstractmethod
     async def get_product_details(self, url: str) -> Dict[str, Any]:
         """Get detailed information about a specific product"""
         pass
 
+    @abstractmethod
+    async def search_page(self, query: str, page_number: int = 1, category: Optional[str] = None,
+                          sort: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return every product on one page of search or category results, raising on errors"""
+        pass
+
+    def item_id(self, url: str) -> str:
+        """Return a stable identity for a product URL, ignoring tracking parameters"""
+        return url.split('?', 1)[0].split('/ref=', 1)[0]
+
+    @staticmethod
+    def has_details(details: Dict[str, Any]) -> bool:
+        """False for the empty result get_product_details returns when extraction fails"""
+        return bool(details and (details.get('specifications') or details.get('special_features')))
+
     @property
     @abstractmethod
     def site_name(self) -> str:
         """Return the name of the e-commerce site"""
-        pass 
\ No newline at end of file
+        pass
+
+    @classmethod
+    def profile_for(cls, method_name: str) -> str:
+        """Return the context profile declared by a scraper method"""
+        return getattr(getattr(cls, method_name), 'page_profile', 'default')
+
+    async def local_first_search(self, query: str, num_products: int = 3,
+                                 max_age: float = LOCAL_MAX_AGE) -> List[Dict[str, Any]]:
+        """Answer from the local index, going to the site only when it has too few fresh results"""
+        if self.index:
+            results = self.index.search(query, site=self.site_name, limit=num_products, max_age=max_age)
+            if len(results) >= num_products:
+                for product in results:
+                    product.pop('site', None)
+                return results
+        return await self.search_products(query, num_products)
+
+    async def local_first_details(self, url: str, max_age: float = LOCAL_MAX_AGE) -> Dict[str, Any]:
+        """Return indexed details for a product, scraping them only when missing or stale"""
+        if self.index:
+            details = self.index.get_details(url, max_age=max_age)
+            if details:
+                return details
+        return await self.get_product_details(url)
+
+    def _index_products(self, products: List[Dict[str, Any]]):
+        """Record search results in the local index"""
+        if self.index and products:
+            try:
+                self.index.add_products(self.site_name, products)
+            except Exception as e:
+                print(f"Error indexing {self.site_name} results: {e}")
+
+    def _index_details(self, url: str, details: Dict[str, Any]):
+        """Record product details in the local index"""
+        if self.index:
+            try:
+                self.index.add_details(self.site_name, url, details)
+            except Exception as e:
+                print(f"Error indexing {self.site_name} details: {e}")
@@ -1,22 +1,30 @@
 from .amazon import AmazonScraper
 from .ebay import EbayScraper
+from utils.scheduler import INTERACTIVE
 import asyncio
 
-async def search_all_sites(browser_manager, query, num_products):
+async def search_all_sites(browser_manager, query, num_products, index=None, local_first=False,
+                           priority=INTERACTIVE):
     amazon_page = None
     ebay_page = None
     
     try:
         # Initialize both scrapers with a new page from the browser manager
-        amazon_page = await browser_manager.new_page()
-        ebay_page = await browser_manager.new_page()
+        amazon_page = await browser_manager.new_page(AmazonScraper.profile_for('search_products'))
+        ebay_page = await browser_manager.new_page(EbayScraper.profile_for('search_products'))
         
-        amazon_scraper = AmazonScraper(amazon_page)
-        ebay_scraper = EbayScraper(ebay_page)
+        amazon_scraper = AmazonScraper(amazon_page, index)
+        ebay_scraper = EbayScraper(ebay_page, index)
         
+        async def scheduled_search(scraper):
+            async with browser_manager.scheduler.slot(priority):
+                if local_first:
+                    return await scraper.local_first_search(query, num_products)
+                return await scraper.search_products(query, num_products)
+
         # Start both searches concurrently
-        amazon_future = amazon_scraper.search_products(query, num_products)
-        ebay_future = ebay_scraper.search_products(query, num_products)
+        amazon_future = scheduled_search(amazon_scraper)
+        ebay_future = scheduled_search(ebay_scraper)
         
         # Wait for both to complete with timeout
         amazon_results, ebay_results = await asyncio.gather(
@@ -1,67 +1,102 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from playwright.async_api import Page
-from .base_scraper import BaseScraper
+from .base_scraper import BaseScraper, page_profile, RESULTS_PER_PAGE
+from utils.product_index import ProductIndex
 import re
 import asyncio
+from urllib.parse import quote, urlencode
 
 class EbayScraper(BaseScraper):
-    def __init__(self, page: Page):
-        super().__init__(page)
+    # Sort orders used as crawl variations: best match, lowest price, highest price, newly listed
+    SORT_ORDERS = [None, '15', '16', '10']
+
+    def __init__(self, page: Page, index: Optional[ProductIndex] = None):
+        super().__init__(page, index)
         self.base_url = "https://www.ebay.com"
 
     @property
     def site_name(self) -> str:
         return "eBay"
 
+    @page_profile('static')
     async def search_products(self, query: str, num_products: int = 3) -> List[Dict[str, Any]]:
-        search_url = f"{self.base_url}/sch/i.html?_nkw={query}"
-        
         try:
-            await self.page.goto(search_url, wait_until='domcontentloaded', timeout=30000)
-            await self.page.wait_for_selector("ul.srp-results", timeout=3000)
-            
-            # Extract all products in one JavaScript execution
-            products = await self.page.evaluate(f"""
-                () => {{
-                    const products = [];
-                    const containers = document.querySelectorAll('ul.srp-results li.s-item:nth-child(-n+{num_products + 5})');
-                    
-                    for (const container of containers) {{
-                        try {{
-                            const titleElem = container.querySelector('div.s-item__title span');
-                            const priceElem = container.querySelector('span.s-item__price');
-                            const urlElem = container.querySelector('a.s-item__link');
-                            const sellerInfoElem = container.querySelector('span.s-item__seller-info-text');
-                            
-                            if (titleElem && priceElem && urlElem) {{
-                                const sellerInfo = sellerInfoElem ? sellerInfoElem.textContent : '';
-                                const feedbackMatch = sellerInfo.match(/\\(([\d,]+)\\)/);
-                                const percentageMatch = sellerInfo.match(/([\d.]+)%/);
-                                
-                                products.push({{
-                                    Name: titleElem.textContent.trim(),
-                                    Price: priceElem.textContent.trim(),
-                                    url: urlElem.href,
-                                    Seller_username: sellerInfo ? sellerInfo.split(' ')[0] : 'Unknown',
-                                    Positive_feedback_rating: feedbackMatch ? feedbackMatch[1] : 'No rating',
-                                    Positive_feedback_percentage: percentageMatch ? percentageMatch[1] + '%' : 'No percentage'
-                                }});
-                            }}
-                        }} catch (e) {{
-                            continue;
-                        }}
-                    }}
-                    
-                    return products.slice(0, {num_products});
-                }}
-            """)
-            
+            products = await self._scrape_results(self.search_url(query), num_products)
+            self._index_products(products)
             return products
             
         except Exception as e:
             print(f"Error accessing eBay: {e}")
             return []
 
+    @page_profile('static')
+    async def search_page(self, query: str, page_number: int = 1, category: Optional[str] = None,
+                          sort: Optional[str] = None) -> List[Dict[str, Any]]:
+        products = await self._scrape_results(
+            self.search_url(query, page_number, category, sort), RESULTS_PER_PAGE
+        )
+        self._index_products(products)
+        return products
+
+    def search_url(self, query: str, page_number: int = 1, category: Optional[str] = None,
+                   sort: Optional[str] = None) -> str:
+        """Build a search or category results URL"""
+        params = {}
+        if query:
+            params['_nkw'] = query
+        if category:
+            params['_sacat'] = category
+        if sort:
+            params['_sop'] = sort
+        if page_number > 1:
+            params['_pgn'] = page_number
+        return f"{self.base_url}/sch/i.html?{urlencode(params, quote_via=quote)}"
+
+    def item_id(self, url: str) -> str:
+        match = re.search(r'/itm/(?:[^/?]+/)?(\d{9,})', url)
+        return f"ebay:{match.group(1)}" if match else super().item_id(url)
+
+    async def _scrape_results(self, search_url: str, num_products: int) -> List[Dict[str, Any]]:
+        await self.page.goto(search_url, wait_until='domcontentloaded', timeout=30000)
+        await self.page.wait_for_selector("ul.srp-results", timeout=3000)
+        
+        # Extract all products in one JavaScript execution
+        products = await self.page.evaluate(f"""
+            () => {{
+                const products = [];
+                const containers = document.querySelectorAll('ul.srp-results li.s-item:nth-child(-n+{num_products + 5})');
+                
+                for (const container of containers) {{
+                    try {{
+                        const titleElem = container.querySelector('div.s-item__title span');
+                        const priceElem = container.querySelector('span.s-item__price');
+                        const urlElem = container.querySelector('a.s-item__link');
+                        const sellerInfoElem = container.querySelector('span.s-item__seller-info-text');
+                        
+                        if (titleElem && priceElem && urlElem) {{
+                            const sellerInfo = sellerInfoElem ? sellerInfoElem.textContent : '';
+                            const feedbackMatch = sellerInfo.match(/\\(([\d,]+)\\)/);
+                            const percentageMatch = sellerInfo.match(/([\d.]+)%/);
+                            
+                            products.push({{
+                                Name: titleElem.textContent.trim(),
+                                Price: priceElem.textContent.trim(),
+                                url: urlElem.href,
+                                Seller_username: sellerInfo ? sellerInfo.split(' ')[0] : 'Unknown',
+                                Positive_feedback_rating: feedbackMatch ? feedbackMatch[1] : 'No rating',
+                                Positive_feedback_percentage: percentageMatch ? percentageMatch[1] + '%' : 'No percentage'
+                            }});
+                        }}
+                    }} catch (e) {{
+                        continue;
+                    }}
+                }}
+                
+                return products.slice(0, {num_products});
+            }}
+        """)
+        return products
+
     async def _extract_product_data(self, container) -> Dict[str, Any]:
         try:
             # Extract all elements concurrently
@@ -122,6 +157,7 @@ class EbayScraper(BaseScraper):
                 "Positive_feedback_percentage": "No percentage"
             }
 
+    @page_profile('static')
     async def get_product_details(self, url: str) -> Dict[str, Any]:
         await self.page.goto(url, wait_until='domcontentloaded')
         
@@ -160,6 +196,7 @@ class EbayScraper(BaseScraper):
                 }
             """)
             
+            self._index_details(url, details)
             return details
             
         except Exception as e:
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+from typing import Optional
+
+# Read still waiting on stdin, shared so a cancelled prompt's line isn't lost
+_pending: Optional[asyncio.Future] = None
+
+
+def _read_line(loop: asyncio.AbstractEventLoop, future: asyncio.Future, prompt: str):
+    try:
+        line = input(prompt)
+    except BaseException as e:
+        loop.call_soon_threadsafe(_set_exception, future, e)
+    else:
+        loop.call_soon_threadsafe(_set_result, future, line)
+
+
+def _set_result(future: asyncio.Future, line: str):
+    if not future.done():
+        future.set_result(line)
+
+
+def _set_exception(future: asyncio.Future, exc: BaseException):
+    if not future.done():
+        future.set_exception(exc)
+
+
+async def ainput(prompt: str = "") -> str:
+    """Non-blocking replacement for input() that lets other tasks run while the user types"""
+    global _pending
+    loop = asyncio.get_running_loop()
+    if _pending is None or _pending.done() or _pending.get_loop() is not loop:
+        _pending = loop.create_future()
+        # Daemon thread so a prompt abandoned by Ctrl-C never blocks interpreter exit
+        threading.Thread(target=_read_line, args=(loop, _pending, prompt), daemon=True).start()
+    else:
+        print(prompt, end="", flush=True)
+    # Shield the read so cancelling this prompt leaves the line for the next one
+    return await asyncio.shield(_pending)
@@ -0,0 +1,119 @@
+import os
+import math
+import json
+import struct
+import hashlib
+from typing import List
+
+_MAGIC = b'SBLOOM1\n'
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        h2 |= 1  # Odd step so the probes never collapse onto one bit
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item: str):
+        for p in self._positions(item):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+
+class ScalableBloomFilter:
+    """Bloom filter that grows by adding larger, stricter filters as it fills.
+
+    Memory stays proportional to the number of distinct items at a few bits
+    per item (roughly two bytes at the default error rate), no matter how long
+    the URLs are. The overall false positive rate stays near error_rate
+    because each new filter gets a tighter share of it. A false positive
+    means an unseen product is skipped; nothing is ever seen twice.
+    """
+
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 0.001,
+                 growth: int = 2, tightening: float = 0.5):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.filters: List[BloomFilter] = []
+        self._add_filter()
+
+    def _add_filter(self):
+        n = len(self.filters)
+        capacity = self.initial_capacity * self.growth ** n
+        error = self.error_rate * (1 - self.tightening) * self.tightening ** n
+        self.filters.append(BloomFilter(capacity, error))
+
+    def __contains__(self, item: str) -> bool:
+        return any(item in f for f in reversed(self.filters))
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self.filters)
+
+    def add(self, item: str) -> bool:
+        """Add an item; returns False if it was (probably) already present"""
+        if item in self:
+            return False
+        if self.filters[-1].count >= self.filters[-1].capacity:
+            self._add_filter()
+        self.filters[-1].add(item)
+        return True
+
+    def save(self, path: str):
+        """Write the filter to disk atomically"""
+        header = json.dumps({
+            'initial_capacity': self.initial_capacity,
+            'error_rate': self.error_rate,
+            'growth': self.growth,
+            'tightening': self.tightening,
+            'counts': [f.count for f in self.filters],
+        }).encode('utf-8')
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for bloom in self.filters:
+                f.write(bloom.bits)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ScalableBloomFilter':
+        with open(path, 'rb') as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not a saved Bloom filter")
+            (header_length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_length))
+            sbf = cls(header['initial_capacity'], header['error_rate'], header['growth'], header['tightening'])
+            sbf.filters = []
+            for count in header['counts']:
+                sbf._add_filter()
+                bloom = sbf.filters[-1]
+                bloom.bits = bytearray(f.read(len(bloom.bits)))
+                bloom.count = count
+        return sbf
+
+    @classmethod
+    def open(cls, path: str, **kwargs) -> 'ScalableBloomFilter':
+        """Load the filter saved at path, or start an empty one"""
+        if os.path.exists(path):
+            return cls.load(path)
+        return cls(**kwargs)
@@ -3,6 +3,8 @@ from typing import List, Optional, Pattern
 import re
 from playwright.async_api import Browser, BrowserContext, Page, Playwright, Route, Request
 import asyncio
+from utils.scheduler import PageScheduler
+from utils.warmup import ConnectionWarmer
 
 
 USER_AGENTS = [
@@ -42,16 +44,36 @@ REQUIRED_SELECTORS = [
     '.s-desktop-width-max'  # Search results container
 ]
 
+# Context settings per page type. 'default' runs JavaScript and filters resources
+# with the route handler; 'static' is for pages whose data is in the server-rendered
+# HTML and only loads the document itself.
+CONTEXT_PROFILES = {
+    'default': {
+        'java_script_enabled': True,
+        'allowed_resource_types': None,
+    },
+    'static': {
+        'java_script_enabled': False,
+        'allowed_resource_types': {'document'},
+    },
+}
+
 class BrowserManager:
     def __init__(self):
         self.browser = None
         self.context = None
+        self.contexts = {}  # Profile name -> BrowserContext, created on first use
+        self._context_lock = asyncio.Lock()
+        self.context_hooks = []  # Coroutines called with (profile, context) for each new context
+        self.scheduler = PageScheduler()  # Every scraper call holds one of its slots
+        self.sites = []  # Base URLs of the sites scraped with this browser
+        self.warmer = None
         self.playwright = None
         self.allowed_patterns = {
             category: re.compile(pattern, re.IGNORECASE) 
             for category, pattern in ALLOWED_RESOURCES.items()
         }
-        self.route_handlers = []  # Track route handlers
+        self.route_handlers = []  # Track (context, route handler) pairs
     
     async def __aenter__(self):
         """Async context manager entry"""
@@ -71,18 +93,44 @@ class BrowserManager:
             headless=True,
         )
         
-        self.context = await self.browser.new_context(
-            user_agent=USER_AGENTS[0],
-            viewport={'width': 1920, 'height': 1080},
-        )
-        
         # Set up route handler
         print("Setting up route handler...")
-        await self._setup_route_handler()
+        self.context = await self.get_context('default')
         print("Resource whitelist initialized")
 
-    async def _setup_route_handler(self):
+    async def get_context(self, profile: str = 'default') -> BrowserContext:
+        """Return the context for a page profile, creating it on first use"""
+        if profile not in CONTEXT_PROFILES:
+            raise ValueError(f"Unknown context profile: {profile}")
+        async with self._context_lock:
+            if profile not in self.contexts:
+                settings = CONTEXT_PROFILES[profile]
+                context = await self.browser.new_context(
+                    user_agent=USER_AGENTS[0],
+                    viewport={'width': 1920, 'height': 1080},
+                    java_script_enabled=settings['java_script_enabled'],
+                )
+                await self._setup_route_handler(context, settings['allowed_resource_types'])
+                self.contexts[profile] = context
+                for hook in self.context_hooks:
+                    await hook(profile, context)
+        return self.contexts[profile]
+
+    async def _setup_route_handler(self, context: BrowserContext, allowed_types: Optional[set] = None):
         """Set up route handler to block unnecessary resources"""
+        async def minimal_route_handler(route: Route, request: Request):
+            try:
+                if request.resource_type in allowed_types:
+                    await route.continue_()
+                else:
+                    await route.abort()
+            except Exception as e:
+                print(f"Error in route handler: {e}")
+                try:
+                    await route.continue_()
+                except:
+                    pass
+
         async def route_handler(route: Route, request: Request):
             try:
                 if request.resource_type == 'document':
@@ -103,28 +151,52 @@ class BrowserManager:
                 except:
                     pass
 
+        handler = route_handler if allowed_types is None else minimal_route_handler
+
         # Store handler reference
-        self.route_handlers.append(route_handler)
-        await self.context.route('**/*', route_handler)
+        self.route_handlers.append((context, handler))
+        await context.route('**/*', handler)
+
+    def register_site(self, base_url: str):
+        """Register a site whose connections warm_up() should pre-open"""
+        if base_url not in self.sites:
+            self.sites.append(base_url)
 
-    async def new_page(self) -> Page:
-        """Create and return a new page"""
-        return await self.context.new_page()
+    async def warm_up(self, profiles: Optional[List[str]] = None) -> List[dict]:
+        """Pre-connect every context profile to every registered site and keep the connections alive.
+
+        Returns the connection setup time saved per profile and site.
+        """
+        if self.warmer:
+            await self.warmer.stop()
+        self.warmer = ConnectionWarmer(self, self.sites, profiles or list(CONTEXT_PROFILES))
+        await self.warmer.start()
+        return self.warmer.report()
+
+    async def new_page(self, profile: str = 'default') -> Page:
+        """Create and return a new page in the context for the given profile"""
+        context = await self.get_context(profile)
+        return await context.new_page()
 
     async def close(self):
         """Close all browser resources"""
         try:
+            if self.warmer:
+                await self.warmer.stop()
+                self.warmer = None
+
             # Unroute all handlers
-            if self.context and self.route_handlers:
-                for handler in self.route_handlers:
-                    try:
-                        await self.context.unroute('**/*', handler)
-                    except Exception as e:
-                        print(f"Error unrouting handler: {e}")
-
-            # Close context and browser
-            if self.context:
-                await self.context.close()
+            for context, handler in self.route_handlers:
+                try:
+                    await context.unroute('**/*', handler)
+                except Exception as e:
+                    print(f"Error unrouting handler: {e}")
+            self.route_handlers = []
+
+            # Close contexts and browser
+            for context in self.contexts.values():
+                await context.close()
+            self.contexts = {}
             if self.browser:
                 await self.browser.close()
             if self.playwright:
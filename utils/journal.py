@@ -0,0 +1,93 @@
+import os
+import json
+import time
+from typing import List, Dict, Any, Optional, Set
+
+
+class RunJournal:
+    """Write-ahead journal that lets a batch run resume after a crash.
+
+    Every unit of work (a query or a product) is journaled as 'started' before
+    it runs and 'done' once its output is on disk, together with the output
+    file size at that point. Output is always flushed before its 'done' entry
+    is written, so on restart anything past the last committed offset belongs
+    to work that never finished and is truncated away.
+    """
+
+    def __init__(self, path: str, output_path: str):
+        self.path = path
+        self.output_path = output_path
+        self.done: Set[str] = set()
+        self.in_flight: Set[str] = set()
+        self.searches: Dict[str, List[Dict[str, Any]]] = {}
+        self.committed_offset = 0
+        self._replay()
+        self._recover_output()
+        self.journal = open(self.path, 'a', encoding='utf-8')
+        self.output = open(self.output_path, 'ab')
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        valid_length = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write; nothing after it was committed
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                valid_length += len(line)
+                key = entry['key']
+                if entry['state'] == 'started':
+                    self.in_flight.add(key)
+                elif entry['state'] == 'searched':
+                    self.searches[key] = entry['products']
+                elif entry['state'] == 'done':
+                    self.in_flight.discard(key)
+                    self.done.add(key)
+                    self.committed_offset = max(self.committed_offset, entry.get('offset', 0))
+        with open(self.path, 'r+b') as f:
+            f.truncate(valid_length)
+
+    def _recover_output(self):
+        if os.path.exists(self.output_path) and os.path.getsize(self.output_path) > self.committed_offset:
+            with open(self.output_path, 'r+b') as f:
+                f.truncate(self.committed_offset)
+        elif not os.path.exists(self.output_path):
+            open(self.output_path, 'w').close()
+
+    def _append(self, entry: Dict[str, Any]):
+        entry['at'] = time.time()
+        self.journal.write(json.dumps(entry) + '\n')
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+
+    def is_done(self, key: str) -> bool:
+        return key in self.done
+
+    def start(self, key: str):
+        self.in_flight.add(key)
+        self._append({'key': key, 'state': 'started'})
+
+    def record_search(self, key: str, products: List[Dict[str, Any]]):
+        """Journal a query's search results so a restart doesn't repeat the search"""
+        self.searches[key] = products
+        self._append({'key': key, 'state': 'searched', 'products': products})
+
+    def complete(self, key: str, records: Optional[List[Dict[str, Any]]] = None):
+        """Write a unit's output records, then mark it done at the new output offset"""
+        for record in records or []:
+            self.output.write((json.dumps(record) + '\n').encode('utf-8'))
+        self.output.flush()
+        os.fsync(self.output.fileno())
+        self.committed_offset = self.output.tell()
+        self.in_flight.discard(key)
+        self.done.add(key)
+        self._append({'key': key, 'state': 'done', 'offset': self.committed_offset})
+
+    def close(self):
+        self.journal.close()
+        self.output.close()
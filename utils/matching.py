@@ -0,0 +1,178 @@
+import re
+import random
+import hashlib
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+# Spec labels (lowercased) that identify a product across sites
+KEY_SPEC_LABELS = {
+    'brand', 'model', 'model name', 'model number', 'item model number',
+    'mpn', 'upc', 'ean', 'series', 'capacity', 'storage capacity',
+    'screen size', 'standing screen display size', 'color', 'colour',
+}
+
+# Filler words that carry no identity on listing titles
+STOP_WORDS = {
+    'a', 'an', 'and', 'the', 'for', 'with', 'of', 'in', 'on', 'to', 'by',
+    'new', 'brand', 'free', 'shipping', 'fast', 'sealed', 'genuine',
+    'original', 'authentic', 'oem', 'lot', 'sale', 'hot', 'edition',
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation and join unit suffixes to their numbers"""
+    text = text.lower().replace('&', ' and ')
+    text = re.sub(r'[^a-z0-9.\s]', ' ', text)
+    text = re.sub(r'(?<!\d)\.|\.(?!\d)', ' ', text)
+    # "256 gb" and "256gb" should produce the same token
+    text = re.sub(r'(\d)\s+(gb|tb|mb|mah|mm|cm|inch|hz|oz|lb|lbs|ml)\b', r'\1\2', text)
+    return ' '.join(word for word in text.split() if word not in STOP_WORDS)
+
+
+def shingle(text: str, k: int = 3) -> Set[str]:
+    """Return word tokens plus character k-shingles of the normalized text"""
+    normalized = normalize_text(text)
+    tokens = set(normalized.split())
+    compact = normalized.replace(' ', '')
+    tokens.update(compact[i:i + k] for i in range(max(len(compact) - k + 1, 0)))
+    return tokens
+
+
+def product_shingles(product: Dict[str, Any], details: Optional[Dict[str, Any]] = None) -> Set[str]:
+    """Build the shingle set for a product from its title and key specs"""
+    shingles = shingle(product.get('Name', ''))
+    specs = (details or {}).get('specifications', {})
+    for label, value in specs.items():
+        if label.strip().lower() in KEY_SPEC_LABELS:
+            value = normalize_text(str(value))
+            if value:
+                # Spec tokens are weighted by adding them as whole values too
+                shingles.add(f"{label.strip().lower()}={value}")
+                shingles.update(value.split())
+    return shingles
+
+
+class MinHasher:
+    """Computes MinHash signatures with a fixed family of hash permutations"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    @staticmethod
+    def _hash(token: str) -> int:
+        return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little')
+
+    def signature(self, shingles: Set[str]) -> Tuple[int, ...]:
+        """Return the MinHash signature of a shingle set"""
+        if not shingles:
+            return tuple([_MAX_HASH] * self.num_perm)
+        hashes = [self._hash(token) for token in shingles]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self.permutations
+        )
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Estimate the Jaccard similarity of two signatures"""
+        matches = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+        return matches / len(sig_a)
+
+
+class LSHIndex:
+    """Banded locality-sensitive hash index over MinHash signatures"""
+
+    def __init__(self, num_perm: int = 128, bands: int = 32):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+
+    def add(self, key: int, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            start = band * self.rows
+            self.buckets[band][signature[start:start + self.rows]].append(key)
+
+    def candidate_pairs(self) -> Set[Tuple[int, int]]:
+        """Return every pair of keys that share at least one band bucket"""
+        pairs = set()
+        for band in self.buckets:
+            for keys in band.values():
+                if len(keys) < 2:
+                    continue
+                for i in range(len(keys)):
+                    for j in range(i + 1, len(keys)):
+                        pairs.add((min(keys[i], keys[j]), max(keys[i], keys[j])))
+        return pairs
+
+
+def match_products(
+    products: List[Dict[str, Any]],
+    details: Optional[Dict[str, Dict[str, Any]]] = None,
+    threshold: float = 0.5,
+    num_perm: int = 128,
+    bands: int = 32,
+) -> List[Dict[str, Any]]:
+    """Group likely-identical products across sites.
+
+    ``details`` maps product URLs to the output of ``get_product_details``.
+    Returns groups sorted by similarity, each with the member products, the
+    sites involved and the mean estimated Jaccard similarity of its matches.
+    """
+    details = details or {}
+    hasher = MinHasher(num_perm)
+    index = LSHIndex(num_perm, bands)
+
+    signatures = []
+    for i, product in enumerate(products):
+        shingles = product_shingles(product, details.get(product.get('url')))
+        signatures.append(hasher.signature(shingles))
+        # Empty titles share the all-max signature and would all match each other
+        if shingles:
+            index.add(i, signatures[i])
+
+    # Union-find over verified cross-site candidate pairs
+    parent = list(range(len(products)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    edges = []
+    for i, j in index.candidate_pairs():
+        if products[i].get('site') == products[j].get('site'):
+            continue
+        score = hasher.similarity(signatures[i], signatures[j])
+        if score >= threshold:
+            edges.append((i, j, score))
+            parent[find(i)] = find(j)
+
+    scores = defaultdict(list)
+    for i, j, score in edges:
+        scores[find(i)].append(score)
+
+    members = defaultdict(list)
+    for i in range(len(products)):
+        if find(i) in scores:
+            members[find(i)].append(products[i])
+
+    groups = [
+        {
+            'products': members[root],
+            'sites': sorted({p.get('site', 'Unknown') for p in members[root]}),
+            'similarity': round(sum(group_scores) / len(group_scores), 3),
+        }
+        for root, group_scores in scores.items()
+    ]
+    return sorted(groups, key=lambda g: g['similarity'], reverse=True)
@@ -5,11 +5,12 @@ from sites.base_scraper import BaseScraper
 def print_header():
     print(f"\n{Back.BLUE}{Fore.WHITE} === Starting optimized scraper === {Style.RESET_ALL}\n")
 
-def print_available_sites(sites: Dict, num_products: int):
+def print_available_sites(sites: Dict, num_products: int, local_first: bool = False):
     print(f"{Fore.GREEN}Available Sites:{Style.RESET_ALL}")
     for key, (site_name, _) in sites.items():
         print(f"{Fore.YELLOW}{key}. {site_name}{Style.RESET_ALL}")
     print(f"\n{Fore.BLUE}Current number of products to scrape: {num_products}{Style.RESET_ALL}")
+    print(f"{Fore.BLUE}Local-first search: {'on' if local_first else 'off'}{Style.RESET_ALL}")
 
 def print_search_results(results: List[Dict[str, Any]]):
     print(f"\n{Fore.GREEN}Products Found:{Style.RESET_ALL}\n")
@@ -75,6 +76,42 @@ def print_product_details(product: Dict[str, Any], details: Dict[str, Any]):
                     print(f"{Fore.GREEN}• {Style.RESET_ALL}{feature}\n")
         print()
 
+def print_matched_groups(groups: List[Dict[str, Any]]):
+    if not groups:
+        return
+    print(f"\n{Fore.GREEN}Matching Products Across Sites:{Style.RESET_ALL}\n")
+    for i, group in enumerate(groups, 1):
+        print(f"{Back.BLUE}{Fore.WHITE} Match {i} (similarity {group['similarity']:.2f}): {Style.RESET_ALL}")
+        for product in group['products']:
+            print(f"{Fore.YELLOW}{product.get('site', 'Unknown')}: {Style.RESET_ALL}{product['Name']} - {product.get('Price', 'N/A')}")
+        print(f"{Fore.BLUE}{'-' * 80}{Style.RESET_ALL}\n")
+
+def print_scheduler_metrics(metrics: Dict[str, Dict[str, Any]]):
+    print(f"\n{Fore.GREEN}Page scheduler:{Style.RESET_ALL}")
+    print(f"{'class':<13}{'queued':>7}{'running':>8}{'max q':>7}{'done':>6}{'cancel':>7}{'preempt':>8}{'avg wait':>10}{'max wait':>10}")
+    for priority, m in metrics.items():
+        print(f"{Fore.YELLOW}{priority:<13}{Style.RESET_ALL}{m['queue_depth']:>7}{m['running']:>8}{m['max_depth']:>7}"
+              f"{m['dispatched']:>6}{m['cancelled']:>7}{m['preempted']:>8}{m['avg_wait']:>9.2f}s{m['max_wait']:>9.2f}s")
+
+def print_warmup_report(report: List[Dict[str, Any]]):
+    print(f"{Fore.GREEN}Connection warm-up:{Style.RESET_ALL}")
+    for entry in report:
+        if entry['error']:
+            print(f"{Fore.RED}{entry['profile']:<8} {entry['origin']}: {entry['error']}{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.YELLOW}{entry['profile']:<8} {entry['origin']}: {Style.RESET_ALL}"
+                  f"{entry['setup_ms']:.0f} ms of DNS/TCP/TLS connection setup pre-paid")
+
+def print_keepalive_report(report: List[Dict[str, Any]]):
+    pings = sum(entry['pings'] for entry in report)
+    reconnects = sum(entry['reconnects'] for entry in report)
+    print(f"{Fore.BLUE}Keep-alive: {pings} pings, {reconnects} reconnects after idle gaps{Style.RESET_ALL}")
+    for entry in report:
+        if entry['first_navigation_ms'] is not None:
+            print(f"{Fore.YELLOW}{entry['profile']:<8} {entry['origin']}: {Style.RESET_ALL}"
+                  f"first navigation paid {entry['first_navigation_ms']:.0f} ms of connection setup "
+                  f"(warm-up pre-paid {entry['setup_ms']:.0f} ms)")
+
 def print_error(message: str):
     print(f"{Fore.RED}{message}{Style.RESET_ALL}")
 
@@ -0,0 +1,146 @@
+import re
+import json
+import time
+import sqlite3
+from typing import List, Dict, Any, Optional
+
+DEFAULT_INDEX_PATH = "product_index.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    site TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    details TEXT,
+    scraped_at REAL NOT NULL,
+    details_scraped_at REAL
+);
+-- rowid of each FTS row is the id of its products row
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, specs,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+class ProductIndex:
+    """Local SQLite FTS5 index of every scraped product"""
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(products)")}
+        if 'details_scraped_at' not in columns:
+            # Indexes created before details had their own timestamp
+            self.conn.execute("ALTER TABLE products ADD COLUMN details_scraped_at REAL")
+
+    def _upsert(self, url: str, site: str, name: str, data: str, details: Optional[str],
+                scraped_at: float, details_scraped_at: Optional[float]):
+        self.conn.execute(
+            "INSERT INTO products (url, site, name, data, details, scraped_at, details_scraped_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET site = excluded.site, name = excluded.name, "
+            "data = excluded.data, details = excluded.details, scraped_at = excluded.scraped_at, "
+            "details_scraped_at = excluded.details_scraped_at",
+            (url, site, name, data, details, scraped_at, details_scraped_at)
+        )
+        rowid = self.conn.execute("SELECT id FROM products WHERE url = ?", (url,)).fetchone()['id']
+        self.conn.execute("DELETE FROM products_fts WHERE rowid = ?", (rowid,))
+        self.conn.execute(
+            "INSERT INTO products_fts (rowid, name, specs) VALUES (?, ?, ?)",
+            (rowid, name, self._specs_text(details))
+        )
+
+    def add_products(self, site: str, products: List[Dict[str, Any]]):
+        """Write search results into the index, keeping any stored details"""
+        now = time.time()
+        with self.conn:
+            for product in products:
+                url = product.get('url')
+                if not url:
+                    continue
+                row = self.conn.execute(
+                    "SELECT details, details_scraped_at FROM products WHERE url = ?", (url,)
+                ).fetchone()
+                details = row['details'] if row else None
+                details_scraped_at = row['details_scraped_at'] if row else None
+                data = {k: v for k, v in product.items() if k != 'site'}
+                self._upsert(url, site, product.get('Name', ''), json.dumps(data), details, now, details_scraped_at)
+
+    def add_details(self, site: str, url: str, details: Dict[str, Any]):
+        """Attach product details to an indexed product"""
+        if not details.get('specifications') and not details.get('special_features'):
+            return
+        details_json = json.dumps(details)
+        now = time.time()
+        with self.conn:
+            row = self.conn.execute("SELECT * FROM products WHERE url = ?", (url,)).fetchone()
+            if row:
+                self._upsert(url, row['site'], row['name'], row['data'], details_json, row['scraped_at'], now)
+            else:
+                # Details without a search result stay out of search answers (empty name)
+                self._upsert(url, site, '', json.dumps({'url': url}), details_json, now, now)
+
+    def get_details(self, url: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return stored details for a URL, or None if missing or older than max_age seconds"""
+        row = self.conn.execute(
+            "SELECT details, details_scraped_at FROM products WHERE url = ?", (url,)
+        ).fetchone()
+        if not row or not row['details']:
+            return None
+        if max_age is not None and time.time() - (row['details_scraped_at'] or 0) > max_age:
+            return None
+        return json.loads(row['details'])
+
+    def search(self, query: str, site: Optional[str] = None, limit: int = 21,
+               max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return indexed products matching every query term, best BM25 rank first"""
+        match = self._match_expression(query)
+        if not match:
+            return []
+        sql = (
+            "SELECT p.site, p.data, p.scraped_at FROM products_fts f "
+            "JOIN products p ON p.id = f.rowid "
+            "WHERE products_fts MATCH ? AND p.name != ''"
+        )
+        params: List[Any] = [match]
+        if site:
+            sql += " AND p.site = ?"
+            params.append(site)
+        if max_age is not None:
+            sql += " AND p.scraped_at >= ?"
+            params.append(time.time() - max_age)
+        # Title matches count ten times more than spec matches
+        sql += " ORDER BY bm25(products_fts, 10.0, 1.0) LIMIT ?"
+        params.append(limit)
+
+        results = []
+        for row in self.conn.execute(sql, params):
+            product = json.loads(row['data'])
+            product['site'] = row['site']
+            results.append(product)
+        return results
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        # Quote each term so FTS5 operators in user input are treated as text
+        terms = re.findall(r'\w+', query.lower())
+        return ' '.join(f'"{term}"' for term in terms)
+
+    @staticmethod
+    def _specs_text(details_json: Optional[str]) -> str:
+        if not details_json:
+            return ''
+        details = json.loads(details_json)
+        parts = [f"{k} {v}" for k, v in details.get('specifications', {}).items()]
+        parts.extend(details.get('special_features', []))
+        return ' '.join(parts)
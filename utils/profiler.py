@@ -0,0 +1,152 @@
+import io
+import os
+import time
+import pstats
+import cProfile
+import tracemalloc
+from typing import List, Dict, Any
+from playwright.async_api import BrowserContext, Page, Request
+
+DEFAULT_PROFILE_DIR = "profile_output"
+TOP_N = 20
+WATERFALL_WIDTH = 50
+
+
+class RunProfiler:
+    """Profiles a run with cProfile, tracemalloc and Playwright tracing.
+
+    Call start() before the work, attach() once the browser is up and stop()
+    before the browser closes. stop() writes report.txt, profile.pstats and
+    one trace-<profile>.zip per browser context into the output directory.
+    """
+
+    def __init__(self, output_dir: str = DEFAULT_PROFILE_DIR):
+        self.output_dir = output_dir
+        self.profiler = cProfile.Profile()
+        self.navigations: List[Dict[str, Any]] = []
+        self.traced_contexts: Dict[str, BrowserContext] = {}
+        self.started_at = 0.0
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.started_at = time.time()
+        tracemalloc.start(25)
+        self.profiler.enable()
+
+    async def attach(self, browser_manager):
+        """Trace every current and future context of the browser manager"""
+        for profile, context in browser_manager.contexts.items():
+            await self._trace_context(profile, context)
+        browser_manager.context_hooks.append(self._trace_context)
+
+    async def _trace_context(self, profile: str, context: BrowserContext):
+        try:
+            await context.tracing.start(title=profile, snapshots=True, screenshots=False)
+            self.traced_contexts[profile] = context
+        except Exception as e:
+            print(f"Error starting trace for {profile} context: {e}")
+        context.on('page', self._watch_page)
+        for page in context.pages:
+            self._watch_page(page)
+
+    def _watch_page(self, page: Page):
+        def on_finished(request: Request):
+            if request.is_navigation_request() and request.frame == page.main_frame:
+                self._record_navigation(request, failed=False)
+
+        def on_failed(request: Request):
+            if request.is_navigation_request() and request.frame == page.main_frame:
+                self._record_navigation(request, failed=True)
+
+        page.on('requestfinished', on_finished)
+        page.on('requestfailed', on_failed)
+
+    def _record_navigation(self, request: Request, failed: bool):
+        timing = request.timing
+
+        def phase(start: str, end: str) -> float:
+            if timing.get(start, -1) < 0 or timing.get(end, -1) < 0:
+                return 0.0
+            return max(timing[end] - timing[start], 0.0)
+
+        self.navigations.append({
+            'url': request.url,
+            'offset': timing['startTime'] / 1000 - self.started_at,
+            'dns': phase('domainLookupStart', 'domainLookupEnd'),
+            'connect': phase('connectStart', 'connectEnd'),
+            'tls': phase('secureConnectionStart', 'connectEnd'),
+            'ttfb': phase('requestStart', 'responseStart'),
+            'download': phase('responseStart', 'responseEnd'),
+            'total': max(timing.get('responseEnd', -1), 0.0),
+            'failed': failed,
+        })
+
+    async def stop(self, browser_manager=None) -> str:
+        """Stop all profilers, save traces and write the combined report"""
+        self.profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        if browser_manager and self._trace_context in browser_manager.context_hooks:
+            browser_manager.context_hooks.remove(self._trace_context)
+        trace_paths = []
+        for profile, context in self.traced_contexts.items():
+            path = os.path.join(self.output_dir, f"trace-{profile}.zip")
+            try:
+                await context.tracing.stop(path=path)
+                trace_paths.append(path)
+            except Exception as e:
+                print(f"Error saving trace for {profile} context: {e}")
+
+        stats_path = os.path.join(self.output_dir, "profile.pstats")
+        self.profiler.dump_stats(stats_path)
+
+        report_path = os.path.join(self.output_dir, "report.txt")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(self._python_section())
+            f.write(self._allocation_section(snapshot))
+            f.write(self._waterfall_section())
+            f.write("\n=== Files ===\n")
+            for path in [stats_path] + trace_paths:
+                f.write(f"{path}\n")
+            f.write("View traces with: playwright show-trace <trace.zip>\n")
+        return report_path
+
+    def _python_section(self) -> str:
+        out = io.StringIO()
+        out.write(f"=== Top {TOP_N} Python hot spots (cumulative time) ===\n")
+        stats = pstats.Stats(self.profiler, stream=out)
+        stats.sort_stats('cumulative').print_stats(TOP_N)
+        out.write(f"\n=== Top {TOP_N} Python hot spots (own time) ===\n")
+        stats.sort_stats('tottime').print_stats(TOP_N)
+        return out.getvalue()
+
+    def _allocation_section(self, snapshot: tracemalloc.Snapshot) -> str:
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        lines = [f"\n=== Top {TOP_N} allocation sites ===\n"]
+        for stat in snapshot.statistics('lineno')[:TOP_N]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024:>10.1f} KiB {stat.count:>8} blocks  {frame.filename}:{frame.lineno}\n")
+        return ''.join(lines)
+
+    def _waterfall_section(self) -> str:
+        lines = [f"\n=== Navigation waterfall ({len(self.navigations)} navigations) ===\n"]
+        if not self.navigations:
+            return ''.join(lines)
+        navigations = sorted(self.navigations, key=lambda n: n['offset'])
+        span = max(n['offset'] + n['total'] / 1000 for n in navigations) or 1.0
+        scale = WATERFALL_WIDTH / span
+        lines.append(f"{'start':>8} {'total':>8} {'dns':>6} {'conn':>6} {'tls':>6} {'ttfb':>7} {'dl':>6}  timeline / url\n")
+        for n in navigations:
+            lead = int(n['offset'] * scale)
+            bar = '#' * max(int(n['total'] / 1000 * scale), 1)
+            status = ' FAILED' if n['failed'] else ''
+            lines.append(
+                f"{n['offset']:>7.2f}s {n['total']:>6.0f}ms {n['dns']:>4.0f}ms {n['connect']:>4.0f}ms "
+                f"{n['tls']:>4.0f}ms {n['ttfb']:>5.0f}ms {n['download']:>4.0f}ms  "
+                f"{' ' * lead}{bar}{status}\n{'':>56}{n['url'][:100]}\n"
+            )
+        return ''.join(lines)
@@ -0,0 +1,188 @@
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+INTERACTIVE = 'interactive'
+PREFETCH = 'prefetch'
+BATCH = 'batch'
+KEEPALIVE = 'keepalive'
+
+# Share of slots each class gets when all of them are waiting
+DEFAULT_WEIGHTS = {
+    INTERACTIVE: 8,
+    PREFETCH: 2,
+    BATCH: 1,
+    KEEPALIVE: 1,
+}
+
+# Classes whose running work may be cancelled to make room for interactive requests
+PREEMPTIBLE = {PREFETCH}
+
+# Classes served only when no other class is waiting, and never moved ahead by aging
+BACKGROUND = {KEEPALIVE}
+
+DEFAULT_MAX_CONCURRENT = 4
+AGING_SECONDS = 30  # A waiter older than this goes next regardless of weights
+
+
+class _Waiter:
+    def __init__(self, priority: str, group: Optional[str]):
+        self.priority = priority
+        self.group = group
+        self.task = asyncio.current_task()
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.monotonic()
+
+
+class PageScheduler:
+    """Priority-aware gate in front of every page navigation.
+
+    Work runs inside ``async with scheduler.slot(priority):``. At most
+    max_concurrent slots are held at once. Free slots go to the waiting
+    classes in proportion to their weights (stride scheduling), except that
+    a waiter older than AGING_SECONDS is served first so batch work is never
+    starved. Background classes such as keep-alive pings only get a slot
+    when no other class is waiting. Interactive requests that find every
+    slot busy cancel running preemptible work and are handed the freed slot,
+    and cancel() drops work whose result is no longer needed.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 weights: Optional[Dict[str, int]] = None, aging_seconds: float = AGING_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.aging_seconds = aging_seconds
+        self.queues = {priority: deque() for priority in self.weights}
+        self.passes = {priority: 0.0 for priority in self.weights}
+        self.running = set()  # _Waiter objects holding a slot
+        self.reserved = 0  # Slots freed by preemption that belong to waiting interactive requests
+        self.stats = {
+            priority: {'dispatched': 0, 'cancelled': 0, 'preempted': 0, 'max_depth': 0,
+                       'total_wait': 0.0, 'max_wait': 0.0}
+            for priority in self.weights
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: str, group: Optional[str] = None):
+        """Hold one page slot for the duration of the block"""
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority class: {priority}")
+        waiter = _Waiter(priority, group)
+        if len(self.running) < self.max_concurrent and not any(self.queues.values()):
+            self._grant(waiter)
+        else:
+            self._enqueue(waiter)
+            if priority == INTERACTIVE:
+                self._preempt()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter in self.queues[priority]:
+                    self.queues[priority].remove(waiter)
+                    self.stats[priority]['cancelled'] += 1
+                elif waiter in self.running:
+                    # Granted and cancelled in the same loop iteration; pass the slot on
+                    self._release(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    def _enqueue(self, waiter: _Waiter):
+        queue = self.queues[waiter.priority]
+        if not queue:
+            # A class returning from idle starts level with the others instead of with saved-up credit
+            active = [self.passes[p] for p, q in self.queues.items() if q]
+            if active:
+                self.passes[waiter.priority] = max(self.passes[waiter.priority], min(active))
+        queue.append(waiter)
+        stats = self.stats[waiter.priority]
+        stats['max_depth'] = max(stats['max_depth'], len(queue))
+
+    def _grant(self, waiter: _Waiter):
+        wait = time.monotonic() - waiter.enqueued_at
+        stats = self.stats[waiter.priority]
+        stats['dispatched'] += 1
+        stats['total_wait'] += wait
+        stats['max_wait'] = max(stats['max_wait'], wait)
+        self.passes[waiter.priority] += 1 / self.weights[waiter.priority]
+        self.running.add(waiter)
+        if not waiter.future.done():
+            waiter.future.set_result(None)
+
+    def _release(self, waiter: _Waiter):
+        self.running.discard(waiter)
+        while len(self.running) < self.max_concurrent:
+            waiter = self._next_waiter()
+            if not waiter:
+                break
+            self._grant(waiter)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        # Interactive waiters that gave up since their preemption no longer hold a reservation
+        self.reserved = min(self.reserved, len(self.queues[INTERACTIVE]))
+        if self.reserved:
+            self.reserved -= 1
+            return self.queues[INTERACTIVE].popleft()
+        heads = {p: q[0] for p, q in self.queues.items() if q and p not in BACKGROUND}
+        if not heads:
+            heads = {p: q[0] for p, q in self.queues.items() if q}
+        if not heads:
+            return None
+        now = time.monotonic()
+        aged = [w for w in heads.values() if now - w.enqueued_at >= self.aging_seconds]
+        if aged:
+            waiter = min(aged, key=lambda w: w.enqueued_at)
+        else:
+            waiter = heads[min(heads, key=lambda p: (self.passes[p], -self.weights[p]))]
+        self.queues[waiter.priority].popleft()
+        return waiter
+
+    def _preempt(self):
+        """Cancel one running preemptible task so a waiting interactive request gets its slot"""
+        if len(self.running) < self.max_concurrent:
+            return
+        victims = [w for w in self.running if w.priority in PREEMPTIBLE and w.task and not w.task.done()]
+        if victims:
+            victim = max(victims, key=lambda w: w.enqueued_at)
+            self.stats[victim.priority]['preempted'] += 1
+            # Without the reservation an aged or higher-credit waiter could take the freed slot
+            self.reserved += 1
+            victim.task.cancel()
+
+    def cancel(self, priority: Optional[str] = None, group: Optional[str] = None) -> int:
+        """Cancel waiting and running work of a class and/or group; returns how many tasks were cancelled"""
+        cancelled = 0
+        waiters = [w for q in self.queues.values() for w in q] + list(self.running)
+        for waiter in waiters:
+            if priority and waiter.priority != priority:
+                continue
+            if group and waiter.group != group:
+                continue
+            if waiter.task and waiter.task is not asyncio.current_task() and not waiter.task.done():
+                waiter.task.cancel()
+                if waiter in self.running:
+                    # Queued waiters are counted when their cancellation lands in slot()
+                    self.stats[waiter.priority]['cancelled'] += 1
+                cancelled += 1
+        return cancelled
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-class queue depth, throughput and wait times (seconds)"""
+        result = {}
+        for priority, stats in self.stats.items():
+            dispatched = stats['dispatched']
+            result[priority] = {
+                'queue_depth': len(self.queues[priority]),
+                'running': sum(1 for w in self.running if w.priority == priority),
+                'max_depth': stats['max_depth'],
+                'dispatched': dispatched,
+                'cancelled': stats['cancelled'],
+                'preempted': stats['preempted'],
+                'avg_wait': stats['total_wait'] / dispatched if dispatched else 0.0,
+                'max_wait': stats['max_wait'],
+            }
+        return result
@@ -0,0 +1,125 @@
+import time
+import asyncio
+from urllib.parse import urlsplit
+from typing import List, Dict, Any, Optional
+from utils.scheduler import KEEPALIVE
+
+# Small document on every site, fetched to open and then refresh connections
+WARMUP_PATH = "/robots.txt"
+# Ping an origin after this many idle seconds; below the typical server keep-alive timeout
+KEEPALIVE_INTERVAL = 45
+WARMUP_TIMEOUT = 15000
+
+
+def _setup_ms(timing: Dict[str, float]) -> float:
+    """DNS + TCP + TLS time of a request, 0 when it reused an open connection"""
+    start = timing.get('domainLookupStart', -1)
+    if start < 0:
+        start = timing.get('connectStart', -1)
+    end = max(timing.get('connectEnd', -1), timing.get('domainLookupEnd', -1))
+    if start < 0 or end < 0:
+        return 0.0
+    return max(end - start, 0.0)
+
+
+class ConnectionWarmer:
+    """Opens connections to each site before the first scrape and keeps them alive.
+
+    Every browser context has its own connection pool, so each site is warmed
+    in each context profile. The report gives the setup time the warm-up
+    request paid up front next to what the first real navigation actually
+    paid, which is near zero when the warm connection was reused.
+    """
+
+    def __init__(self, browser_manager, base_urls: List[str], profiles: List[str],
+                 interval: float = KEEPALIVE_INTERVAL):
+        self.browser_manager = browser_manager
+        self.origins = [f"{urlsplit(url).scheme}://{urlsplit(url).netloc}" for url in base_urls]
+        self.profiles = profiles
+        self.interval = interval
+        self.pages = {}  # Profile -> page used for pings
+        self.last_used: Dict[tuple, float] = {}  # (profile, origin) -> time of last request
+        self.stats: Dict[tuple, Dict[str, Any]] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        for profile in self.profiles:
+            context = await self.browser_manager.get_context(profile)
+            context.on('request', lambda request, profile=profile: self._touch(profile, request.url))
+            context.on('requestfinished',
+                       lambda request, profile=profile: self._record_first_navigation(profile, request))
+            self.pages[profile] = await context.new_page()
+            for origin in self.origins:
+                self.stats[(profile, origin)] = {'setup_ms': 0.0, 'first_navigation_ms': None,
+                                                 'pings': 0, 'reconnects': 0, 'error': None}
+        # Profiles share nothing, so every profile warms its origins in parallel
+        await asyncio.gather(*(self._warm_profile(profile) for profile in self.profiles))
+        self.task = asyncio.create_task(self._keep_alive())
+
+    async def _warm_profile(self, profile: str):
+        for origin in self.origins:
+            stats = self.stats[(profile, origin)]
+            try:
+                stats['setup_ms'] = await self._ping(profile, origin)
+            except Exception as e:
+                stats['error'] = str(e)
+
+    def _touch(self, profile: str, url: str):
+        for origin in self.origins:
+            if url.startswith(origin):
+                self.last_used[(profile, origin)] = time.monotonic()
+
+    def _record_first_navigation(self, profile: str, request):
+        try:
+            if not request.is_navigation_request() or request.frame.page in self.pages.values():
+                return
+        except Exception:
+            # Service worker requests have no frame
+            return
+        for origin in self.origins:
+            stats = self.stats.get((profile, origin))
+            if stats and request.url.startswith(origin) and stats['first_navigation_ms'] is None:
+                stats['first_navigation_ms'] = _setup_ms(request.timing)
+
+    async def _ping(self, profile: str, origin: str) -> float:
+        response = await self.pages[profile].goto(f"{origin}{WARMUP_PATH}", wait_until='commit',
+                                                  timeout=WARMUP_TIMEOUT)
+        self.stats[(profile, origin)]['pings'] += 1
+        return _setup_ms(response.request.timing) if response else 0.0
+
+    async def _keep_alive(self):
+        while True:
+            await asyncio.sleep(self.interval / 3)
+            now = time.monotonic()
+            for (profile, origin), stats in self.stats.items():
+                if now - self.last_used.get((profile, origin), 0) < self.interval:
+                    continue
+                try:
+                    # Pings take a page slot like any navigation, but only when nothing else wants it
+                    async with self.browser_manager.scheduler.slot(KEEPALIVE):
+                        # Real work may have used the connection while this waited
+                        if time.monotonic() - self.last_used.get((profile, origin), 0) < self.interval:
+                            continue
+                        if await self._ping(profile, origin) > 0:
+                            # The server had closed the idle connection anyway
+                            stats['reconnects'] += 1
+                except Exception as e:
+                    stats['error'] = str(e)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Setup time pre-paid by the warm-up and paid by the first navigation, per profile and origin"""
+        return [
+            {'profile': profile, 'origin': origin, **stats}
+            for (profile, origin), stats in self.stats.items()
+        ]
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        for page in self.pages.values():
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self.pages = {}
@@ -0,0 +1,356 @@
+import os
+import hmac
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+
+DEFAULT_QUEUE_PATH = "work_queue.db"
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 5  # Seconds; doubled after every failed attempt
+DEFAULT_SERVE_HOST = "127.0.0.1"
+DEFAULT_SERVE_PORT = 8765
+# Shared secret between a queue server and its workers
+TOKEN_HEADER = "X-Queue-Token"
+TOKEN_ENV = "QUEUE_TOKEN"
+
+
+def job_key(kind: str, payload: Dict[str, Any]) -> str:
+    """Identity of a job, so the same query or URL is never queued twice"""
+    if kind == 'search':
+        return f"search:{payload['site']}:{payload['query'].strip().lower()}:{payload.get('num_products', 3)}"
+    return f"{kind}:{payload['site']}:{payload['url']}"
+
+
+class QueueBackend(ABC):
+    """Shared job queue with lease, ack and retry semantics.
+
+    A worker leases a job for a limited time and must ack it (with the result)
+    or nack it (with the error) before the lease expires. Expired leases are
+    handed to other workers, and failed jobs are retried with exponential
+    backoff until max_attempts is reached. Acks carrying a stale lease token
+    are rejected so a job's result is only recorded once.
+    """
+
+    @abstractmethod
+    async def put(self, kind: str, payload: Dict[str, Any],
+                  max_attempts: int = DEFAULT_MAX_ATTEMPTS, requeue: bool = False) -> Optional[int]:
+        """Queue a job; returns its id, or None if an identical job already exists.
+
+        With requeue, an identical job that is done or failed is reset and run
+        again; only pending and leased jobs count as duplicates.
+        """
+
+    @abstractmethod
+    async def lease(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """Lease the next available job, or return None when there is nothing to do"""
+
+    @abstractmethod
+    async def extend(self, job_id: int, token: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend a lease that is still held"""
+
+    @abstractmethod
+    async def ack(self, job_id: int, token: str, result: Any) -> bool:
+        """Complete a leased job with its result"""
+
+    @abstractmethod
+    async def nack(self, job_id: int, token: str, error: str) -> bool:
+        """Give a leased job back for retry, or fail it after its last attempt"""
+
+    @abstractmethod
+    async def results(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return completed jobs with their results"""
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, int]:
+        """Return the number of jobs in each state"""
+
+    async def close(self):
+        pass
+
+
+class SQLiteQueue(QueueBackend):
+    """Queue stored in a SQLite file, shared by worker processes on one host.
+
+    Each call runs on a worker thread so a writer holding the database lock
+    never blocks the event loop, and calls from one process go one at a time.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        dedupe_key TEXT NOT NULL UNIQUE,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        available_at REAL NOT NULL,
+        lease_owner TEXT,
+        lease_token TEXT,
+        lease_expires REAL,
+        result TEXT,
+        error TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_available ON jobs (status, available_at);
+    """
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        # Autocommit mode so lease() controls its own write transaction
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    async def _run(self, fn, *args):
+        def locked():
+            with self._lock:
+                return fn(*args)
+        return await asyncio.to_thread(locked)
+
+    def _put(self, kind, payload, max_attempts, requeue):
+        now = time.time()
+        key = job_key(kind, payload)
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO jobs (kind, payload, dedupe_key, max_attempts, available_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, json.dumps(payload), key, max_attempts, now, now)
+        )
+        if cursor.rowcount:
+            return cursor.lastrowid
+        if not requeue:
+            return None
+        # Pending and leased jobs still dedupe; finished ones start over
+        cursor = self.conn.execute(
+            "UPDATE jobs SET payload = ?, status = 'pending', attempts = 0, max_attempts = ?, "
+            "available_at = ?, lease_owner = NULL, lease_token = NULL, lease_expires = NULL, "
+            "result = NULL, error = NULL, updated_at = ? "
+            "WHERE dedupe_key = ? AND status IN ('done', 'failed')",
+            (json.dumps(payload), max_attempts, now, now, key)
+        )
+        if not cursor.rowcount:
+            return None
+        return self.conn.execute("SELECT id FROM jobs WHERE dedupe_key = ?", (key,)).fetchone()['id']
+
+    def _lease(self, worker_id, lease_seconds):
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock, so two workers can't lease the same row
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Jobs whose worker died on the last attempt have nowhere left to go
+            self.conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired', updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE (status = 'pending' AND available_at <= ?) "
+                "OR (status = 'leased' AND lease_expires < ?) ORDER BY id LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if not row:
+                self.conn.execute("COMMIT")
+                return None
+            token = uuid.uuid4().hex
+            self.conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_token = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                (worker_id, token, now + lease_seconds, now, row['id'])
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'payload': json.loads(row['payload']),
+            'attempt': row['attempts'] + 1,
+            'token': token,
+        }
+
+    def _update_leased(self, job_id: int, token: str, assignments: str, params: tuple) -> bool:
+        cursor = self.conn.execute(
+            f"UPDATE jobs SET {assignments}, updated_at = ? "
+            "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+            params + (time.time(), job_id, token)
+        )
+        return cursor.rowcount == 1
+
+    def _nack(self, job_id, token, error):
+        row = self.conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row:
+            return False
+        if row['attempts'] >= row['max_attempts']:
+            return self._update_leased(job_id, token, "status = 'failed', error = ?, lease_token = NULL", (error,))
+        delay = RETRY_BASE_DELAY * 2 ** (row['attempts'] - 1)
+        return self._update_leased(
+            job_id, token, "status = 'pending', error = ?, available_at = ?, lease_token = NULL",
+            (error, time.time() + delay)
+        )
+
+    def _results(self, kind):
+        sql = "SELECT id, kind, payload, result FROM jobs WHERE status = 'done'"
+        params = ()
+        if kind:
+            sql += " AND kind = ?"
+            params = (kind,)
+        return [
+            {'id': row['id'], 'kind': row['kind'], 'payload': json.loads(row['payload']),
+             'result': json.loads(row['result'])}
+            for row in self.conn.execute(sql + " ORDER BY id", params)
+        ]
+
+    def _stats(self):
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for row in self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row['status']] = row['n']
+        return counts
+
+    async def put(self, kind, payload, max_attempts=DEFAULT_MAX_ATTEMPTS, requeue=False):
+        return await self._run(self._put, kind, payload, max_attempts, requeue)
+
+    async def lease(self, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return await self._run(self._lease, worker_id, lease_seconds)
+
+    async def extend(self, job_id, token, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return await self._run(self._update_leased, job_id, token, "lease_expires = ?",
+                               (time.time() + lease_seconds,))
+
+    async def ack(self, job_id, token, result):
+        return await self._run(
+            self._update_leased, job_id, token, "status = 'done', result = ?, error = NULL, lease_token = NULL",
+            (json.dumps(result),)
+        )
+
+    async def nack(self, job_id, token, error):
+        return await self._run(self._nack, job_id, token, error)
+
+    async def results(self, kind=None):
+        return await self._run(self._results, kind)
+
+    async def stats(self):
+        return await self._run(self._stats)
+
+    async def close(self):
+        await self._run(self.conn.close)
+
+
+class HTTPQueue(QueueBackend):
+    """Client for a queue shared over the network with serve_queue()"""
+
+    def __init__(self, base_url: str, token: Optional[str] = None):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.session = None
+
+    async def _call(self, method: str, path: str, body: Optional[Dict[str, Any]] = None):
+        import aiohttp
+        if self.session is None:
+            headers = {TOKEN_HEADER: self.token} if self.token else None
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30), headers=headers)
+        async with self.session.request(method, f"{self.base_url}{path}", json=body) as response:
+            response.raise_for_status()
+            return (await response.json())['value']
+
+    async def put(self, kind, payload, max_attempts=DEFAULT_MAX_ATTEMPTS, requeue=False):
+        return await self._call('POST', '/jobs', {'kind': kind, 'payload': payload,
+                                                  'max_attempts': max_attempts, 'requeue': requeue})
+
+    async def lease(self, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return await self._call('POST', '/lease', {'worker_id': worker_id, 'lease_seconds': lease_seconds})
+
+    async def extend(self, job_id, token, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return await self._call('POST', f'/jobs/{job_id}/extend', {'token': token, 'lease_seconds': lease_seconds})
+
+    async def ack(self, job_id, token, result):
+        return await self._call('POST', f'/jobs/{job_id}/ack', {'token': token, 'result': result})
+
+    async def nack(self, job_id, token, error):
+        return await self._call('POST', f'/jobs/{job_id}/nack', {'token': token, 'error': error})
+
+    async def results(self, kind=None):
+        return await self._call('GET', f'/results?kind={kind}' if kind else '/results')
+
+    async def stats(self):
+        return await self._call('GET', '/stats')
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+
+
+async def serve_queue(backend: QueueBackend, host: str = DEFAULT_SERVE_HOST, port: int = DEFAULT_SERVE_PORT,
+                      token: Optional[str] = None):
+    """Expose a queue backend over HTTP for HTTPQueue clients on other hosts.
+
+    When a token is given every request must carry it in the X-Queue-Token header.
+    """
+    from aiohttp import web
+
+    @web.middleware
+    async def check_token(request, handler):
+        if token and not hmac.compare_digest(request.headers.get(TOKEN_HEADER, ''), token):
+            raise web.HTTPUnauthorized(text="missing or wrong queue token")
+        return await handler(request)
+
+    def reply(value):
+        return web.json_response({'value': value})
+
+    async def put(request):
+        body = await request.json()
+        return reply(await backend.put(body['kind'], body['payload'],
+                                       body.get('max_attempts', DEFAULT_MAX_ATTEMPTS), body.get('requeue', False)))
+
+    async def lease(request):
+        body = await request.json()
+        return reply(await backend.lease(body['worker_id'], body.get('lease_seconds', DEFAULT_LEASE_SECONDS)))
+
+    async def extend(request):
+        body = await request.json()
+        job_id = int(request.match_info['job_id'])
+        return reply(await backend.extend(job_id, body['token'], body.get('lease_seconds', DEFAULT_LEASE_SECONDS)))
+
+    async def ack(request):
+        body = await request.json()
+        return reply(await backend.ack(int(request.match_info['job_id']), body['token'], body['result']))
+
+    async def nack(request):
+        body = await request.json()
+        return reply(await backend.nack(int(request.match_info['job_id']), body['token'], body['error']))
+
+    async def results(request):
+        return reply(await backend.results(request.query.get('kind')))
+
+    async def stats(request):
+        return reply(await backend.stats())
+
+    app = web.Application(middlewares=[check_token])
+    app.add_routes([
+        web.post('/jobs', put),
+        web.post('/lease', lease),
+        web.post('/jobs/{job_id}/extend', extend),
+        web.post('/jobs/{job_id}/ack', ack),
+        web.post('/jobs/{job_id}/nack', nack),
+        web.get('/results', results),
+        web.get('/stats', stats),
+    ])
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def open_queue(spec: str, token: Optional[str] = None) -> QueueBackend:
+    """Open a queue from a spec: a SQLite file path or an http(s):// URL"""
+    if spec.startswith(('http://', 'https://')):
+        return HTTPQueue(spec, token or os.environ.get(TOKEN_ENV))
+    return SQLiteQueue(spec)
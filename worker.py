@@ -0,0 +1,222 @@
+import asyncio
+import argparse
+import os
+import socket
+from typing import Dict, Any
+from playwright.async_api import async_playwright
+from utils.browser import BrowserManager
+from utils.work_queue import (
+    QueueBackend, open_queue, serve_queue, DEFAULT_QUEUE_PATH, DEFAULT_LEASE_SECONDS,
+    DEFAULT_SERVE_HOST, DEFAULT_SERVE_PORT, TOKEN_ENV
+)
+from utils.profiler import RunProfiler, DEFAULT_PROFILE_DIR
+from utils.product_index import ProductIndex, DEFAULT_INDEX_PATH
+from utils.scheduler import BATCH
+from sites.amazon import AmazonScraper
+from sites.ebay import EbayScraper
+from colorama import init
+from utils.print_utils import (
+    print_error, print_success, print_info, print_scheduler_metrics,
+    print_warmup_report, print_keepalive_report
+)
+
+# Initialize colorama
+init(autoreset=True)
+
+SCRAPERS = {
+    "Amazon": AmazonScraper,
+    "eBay": EbayScraper,
+}
+
+IDLE_POLL_SECONDS = 2
+
+
+class Worker:
+    """Pulls jobs from a shared queue and runs them with its own browser"""
+
+    def __init__(self, queue: QueueBackend, browser_manager: BrowserManager, worker_id: str,
+                 follow_details: bool = False, index: ProductIndex = None):
+        self.queue = queue
+        self.browser_manager = browser_manager
+        self.worker_id = worker_id
+        self.follow_details = follow_details
+        self.index = index
+        self.pages = {}  # (site, method name) -> Page
+
+    async def _scraper(self, site: str, method_name: str):
+        scraper_class = SCRAPERS[site]
+        key = (site, method_name)
+        if key not in self.pages:
+            self.pages[key] = await self.browser_manager.new_page(scraper_class.profile_for(method_name))
+        return scraper_class(self.pages[key], self.index)
+
+    async def _run_job(self, job: Dict[str, Any]):
+        async with self.browser_manager.scheduler.slot(BATCH):
+            return await self._scrape(job)
+
+    async def _scrape(self, job: Dict[str, Any]):
+        payload = job['payload']
+        if job['kind'] == 'search':
+            scraper = await self._scraper(payload['site'], 'search_products')
+            products = await scraper.search_products(payload['query'], payload.get('num_products', 3))
+            if not products:
+                # Scrapers return [] on navigation errors; retrying is the only way to tell them apart
+                raise RuntimeError("no products found")
+            if self.follow_details:
+                for product in products:
+                    await self.queue.put('details', {'site': payload['site'], 'url': product['url']})
+            return products
+        if job['kind'] == 'details':
+            scraper = await self._scraper(payload['site'], 'get_product_details')
+            details = await scraper.get_product_details(payload['url'])
+            if not scraper.has_details(details):
+                # Scrapers return empty details on extraction errors; nack so the job is retried
+                raise RuntimeError("no details extracted")
+            return details
+        raise ValueError(f"Unknown job kind: {job['kind']}")
+
+    async def _keep_lease(self, job: Dict[str, Any]):
+        delay = DEFAULT_LEASE_SECONDS / 3
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                if not await self.queue.extend(job['id'], job['token']):
+                    print_error(f"[{self.worker_id}] lease on job {job['id']} was lost")
+                    return
+                delay = DEFAULT_LEASE_SECONDS / 3
+            except Exception as e:
+                # A queue server hiccup must not let the lease lapse mid-scrape; try again soon
+                print_error(f"[{self.worker_id}] could not extend lease on job {job['id']}: {e}")
+                delay = IDLE_POLL_SECONDS
+
+    async def run(self, stop_when_empty: bool = False):
+        while True:
+            job = await self.queue.lease(self.worker_id)
+            if not job:
+                if stop_when_empty:
+                    # Leased jobs may still fail back into the queue or add details jobs
+                    stats = await self.queue.stats()
+                    if not stats['pending'] and not stats['leased']:
+                        return
+                await asyncio.sleep(IDLE_POLL_SECONDS)
+                continue
+
+            print_info(f"[{self.worker_id}] {job['kind']} job {job['id']} (attempt {job['attempt']})")
+            heartbeat = asyncio.create_task(self._keep_lease(job))
+            try:
+                result = await self._run_job(job)
+            except Exception as e:
+                print_error(f"[{self.worker_id}] job {job['id']} failed: {e}")
+                await self.queue.nack(job['id'], job['token'], str(e))
+            else:
+                if not await self.queue.ack(job['id'], job['token'], result):
+                    print_error(f"[{self.worker_id}] lease on job {job['id']} was lost, result discarded")
+            finally:
+                heartbeat.cancel()
+
+
+async def run_worker(queue_spec: str, concurrency: int, follow_details: bool,
+                     stop_when_empty: bool, profile_dir: str = None, token: str = None,
+                     index_path: str = DEFAULT_INDEX_PATH):
+    queue = open_queue(queue_spec, token)
+    # Results also feed this host's local index that interactive local-first search answers from
+    index = ProductIndex(index_path) if index_path else None
+    profiler = None
+    try:
+        if profile_dir:
+            profiler = RunProfiler(profile_dir)
+            profiler.start()
+        async with async_playwright() as playwright:
+            browser_manager = BrowserManager()
+            await browser_manager.init_browser(playwright)
+            for scraper_class in SCRAPERS.values():
+                browser_manager.register_site(scraper_class(None).base_url)
+            print_warmup_report(await browser_manager.warm_up())
+            if profiler:
+                await profiler.attach(browser_manager)
+            try:
+                host_id = f"{socket.gethostname()}-{os.getpid()}"
+                workers = [
+                    Worker(queue, browser_manager, f"{host_id}-{i}", follow_details, index)
+                    for i in range(concurrency)
+                ]
+                await asyncio.gather(*(worker.run(stop_when_empty) for worker in workers))
+            finally:
+                if profiler:
+                    print_info(f"Profiling report written to {await profiler.stop(browser_manager)}")
+                print_scheduler_metrics(browser_manager.scheduler.metrics())
+                print_keepalive_report(browser_manager.warmer.report())
+                await browser_manager.close()
+        print_success(f"Queue status: {await queue.stats()}")
+    finally:
+        if index:
+            index.close()
+        await queue.close()
+
+
+async def enqueue(queue_spec: str, queries, sites, num_products: int, token: str = None):
+    queue = open_queue(queue_spec, token)
+    try:
+        added = 0
+        for query in queries:
+            for site in sites:
+                payload = {'site': site, 'query': query, 'num_products': num_products}
+                # Queries already done or failed are run again; pending or leased ones are left alone
+                if await queue.put('search', payload, requeue=True):
+                    added += 1
+        skipped = len(queries) * len(sites) - added
+        print_success(f"Queued {added} search jobs, {skipped} already pending or running ({await queue.stats()})")
+    finally:
+        await queue.close()
+
+
+async def serve(queue_path: str, host: str, port: int, token: str = None):
+    queue = open_queue(queue_path)
+    runner = await serve_queue(queue, host, port, token)
+    print_success(f"Serving {queue_path} on http://{host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        await queue.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queue-backed scraper worker")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH,
+                        help="SQLite queue file or http(s):// URL of a queue server")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                        help=f"shared secret for the queue server (default: ${TOKEN_ENV})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    add = subparsers.add_parser("enqueue", help="queue search jobs")
+    add.add_argument("queries", nargs="+")
+    add.add_argument("--sites", nargs="+", default=list(SCRAPERS), choices=list(SCRAPERS))
+    add.add_argument("--num-products", type=int, default=3)
+
+    work = subparsers.add_parser("work", help="pull and run jobs")
+    work.add_argument("--concurrency", type=int, default=2, help="jobs run at once by this process")
+    work.add_argument("--details", action="store_true", help="queue a details job for every search result")
+    work.add_argument("--exit-when-empty", action="store_true")
+    work.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_DIR, metavar="DIR")
+    work.add_argument("--index", default=DEFAULT_INDEX_PATH, help="local product index to add results to")
+    work.add_argument("--no-index", action="store_true", help="don't add results to the local index")
+
+    server = subparsers.add_parser("serve", help="share a SQLite queue over HTTP")
+    server.add_argument("--host", default=DEFAULT_SERVE_HOST, help="use 0.0.0.0 to accept other hosts")
+    server.add_argument("--port", type=int, default=DEFAULT_SERVE_PORT)
+
+    args = parser.parse_args()
+    if args.command == "serve" and args.host not in ("127.0.0.1", "localhost", "::1") and not args.token:
+        parser.error(f"--token (or ${TOKEN_ENV}) is required to serve the queue beyond localhost")
+    try:
+        if args.command == "enqueue":
+            asyncio.run(enqueue(args.queue, args.queries, args.sites, args.num_products, args.token))
+        elif args.command == "work":
+            asyncio.run(run_worker(args.queue, args.concurrency, args.details,
+                                   args.exit_when_empty, args.profile, args.token,
+                                   None if args.no_index else args.index))
+        else:
+            asyncio.run(serve(args.queue, args.host, args.port, args.token))
+    except KeyboardInterrupt:
+        print_info("Stopped")